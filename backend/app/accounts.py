@@ -0,0 +1,122 @@
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.dependencies import membership_cache, user_cache
+from app.jobs import current_job_id, job_handler, report_progress
+from app.models.group import Group, GroupMembership
+from app.models.job import Job
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+from app.models.task_tombstone import TaskTombstone
+from app.models.user import User
+
+# Tables holding a user's rows in bulk, deleted chunk by chunk before the user.
+OWNED_MODELS = (Task, TaskArchive, TaskTombstone)
+
+
+async def owns_more_than(db: AsyncSession, user_id: int, limit: int) -> bool:
+    # Bounded probes: an index seek past `limit` rows per table instead of a
+    # full count.
+    for model in OWNED_MODELS:
+        probe = select(model.id).where(model.owner_id == user_id).offset(limit).limit(1)
+        if await db.scalar(probe) is not None:
+            return True
+    return False
+
+
+async def delete_account(db: AsyncSession, user_id: int, chunk_size: int = 1000) -> dict:
+    """Delete a user and everything they own without loading it.
+
+    Owned rows go in chunked, set-based DELETEs, each committed on its own so
+    no transaction holds locks for long. When running as a job, progress is
+    written to the job's result after every chunk.
+    """
+    total = await db.scalar(select(User.task_count).where(User.id == user_id))
+    if total is None:
+        return {"deleted_tasks": 0, "total_tasks": 0}
+
+    deleted = 0
+    for model in OWNED_MODELS:
+        while True:
+            chunk = select(model.id).where(model.owner_id == user_id).limit(chunk_size)
+            result = await db.execute(
+                delete(model)
+                .where(model.id.in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+            if not result.rowcount:
+                break
+            if model is Task:
+                deleted += result.rowcount
+            await report_progress(db, {"deleted_tasks": deleted, "total_tasks": total})
+            await db.commit()
+
+    result = await db.scalars(
+        delete(GroupMembership)
+        .where(GroupMembership.user_id == user_id)
+        .returning(GroupMembership.group_id)
+    )
+    group_ids = result.all()
+    if group_ids:
+        # Groups that just lost their last owner promote their longest-standing
+        # member; groups left with no members and no tasks are removed.
+        other = aliased(GroupMembership)
+        has_owner = (
+            select(other.group_id)
+            .where(other.group_id == GroupMembership.group_id, other.role == "owner")
+            .exists()
+        )
+        first_member = (
+            select(func.min(other.user_id))
+            .where(other.group_id == GroupMembership.group_id)
+            .scalar_subquery()
+        )
+        await db.execute(
+            update(GroupMembership)
+            .where(
+                GroupMembership.group_id.in_(group_ids),
+                ~has_owner,
+                GroupMembership.user_id == first_member,
+            )
+            .values(role="owner")
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            delete(Group)
+            .where(
+                Group.id.in_(group_ids),
+                ~exists().where(GroupMembership.group_id == Group.id),
+                ~exists().where(Task.group_id == Group.id),
+                ~exists().where(TaskArchive.group_id == Group.id),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    # The job doing the deleting is kept, detached, so its result survives.
+    await db.execute(
+        delete(Job)
+        .where(Job.owner_id == user_id, Job.id != current_job_id.get())
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(Job)
+        .where(Job.owner_id == user_id)
+        .values(owner_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(User).where(User.id == user_id).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+    user_cache.invalidate(user_id)
+    for group_id in group_ids:
+        membership_cache.invalidate((group_id, user_id))
+    return {"deleted_tasks": deleted, "total_tasks": total}
+
+
+@job_handler("delete_account")
+async def _delete_account(db: AsyncSession, payload: dict) -> dict:
+    return await delete_account(db, payload["user_id"], chunk_size=settings.delete_chunk_size)
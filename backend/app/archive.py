@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import delete, insert, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.changes import record_tombstones, reserve_change_seqs
+from app.config import settings
+from app.events import event_broker
+from app.jobs import enqueue, job_handler
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+from app.timeutils import utcnow
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "completed",
+    "owner_id",
+    "group_id",
+    "version",
+    "updated_at",
+)
+
+
+async def archive_completed_tasks(
+    db: AsyncSession, older_than: timedelta, chunk_size: int = 1000
+) -> int:
+    """Move completed tasks untouched for ``older_than`` into tasks_archive.
+
+    Each chunk is its own short transaction. On Postgres, rows locked by
+    in-flight writes are skipped rather than waited on; a later run picks
+    them up.
+    """
+    cutoff = utcnow() - older_than
+    archived = 0
+    while True:
+        chunk = (
+            select(Task.id)
+            .where(
+                Task.completed == true(),
+                or_(Task.updated_at.is_(None), Task.updated_at < cutoff),
+            )
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            delete(Task)
+            .where(Task.id.in_(chunk))
+            .returning(*(getattr(Task, column) for column in ARCHIVE_COLUMNS))
+        )
+        rows = result.all()
+        if not rows:
+            return archived
+
+        archived_at = utcnow()
+        await db.execute(
+            insert(TaskArchive),
+            [dict(zip(ARCHIVE_COLUMNS, row)) | {"archived_at": archived_at} for row in rows],
+        )
+        task_ids: dict[int, list[int]] = {}
+        for row in rows:
+            task_ids.setdefault(row.owner_id, []).append(row.id)
+        for owner_id, ids in task_ids.items():
+            await record_tombstones(db, owner_id, ids, completed=len(ids))
+        await db.commit()
+
+        for owner_id, ids in task_ids.items():
+            await event_broker.publish_many(
+                owner_id, [{"type": "archived", "id": task_id} for task_id in ids]
+            )
+        archived += len(rows)
+
+
+async def restore_task(db: AsyncSession, owner_id: int, task_id: int) -> Task | None:
+    result = await db.execute(
+        delete(TaskArchive)
+        .where(TaskArchive.id == task_id, TaskArchive.owner_id == owner_id)
+        .returning(*(getattr(TaskArchive, column) for column in ARCHIVE_COLUMNS))
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    values = dict(zip(ARCHIVE_COLUMNS, row))
+    if await db.scalar(select(Task.id).where(Task.id == task_id)) is not None:
+        # SQLite can hand an archived task's id to a new task.
+        del values["id"]
+    change_seq = await reserve_change_seqs(
+        db, owner_id, tasks=1, completed=int(values["completed"])
+    )
+    values |= {"version": values["version"] + 1, "change_seq": change_seq}
+    values.pop("updated_at")
+
+    result = await db.scalars(insert(Task).values(**values).returning(Task))
+    return result.one()
+
+
+@job_handler("archive_completed_tasks")
+async def _archive_completed_tasks(db: AsyncSession, payload: dict) -> dict:
+    archived = await archive_completed_tasks(
+        db,
+        timedelta(days=payload.get("older_than_days", settings.archive_after_days)),
+        chunk_size=settings.archive_chunk_size,
+    )
+    return {"archived": archived}
+
+
+async def schedule_archival_forever(
+    session_factory: async_sessionmaker[AsyncSession], interval: float
+) -> None:
+    # Every worker runs this loop; the dedupe key keeps it to one pending run
+    # between them, and the job queue hands that to a single worker.
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as session:
+                await enqueue(
+                    session,
+                    "archive_completed_tasks",
+                    {},
+                    dedupe_key="archive_completed_tasks",
+                )
+        except Exception:
+            logger.exception("Failed to schedule task archival")
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, case, delete, event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.models.task_tombstone import TaskTombstone
+from app.models.user import User
+from app.timeutils import utcnow
+
+
+def _reserve_statement(user_id: int, count: int, tasks: int = 0, completed: int = 0):
+    values = {"change_seq": User.change_seq + count}
+    if tasks:
+        values["task_count"] = User.task_count + tasks
+    if completed:
+        values["completed_count"] = User.completed_count + completed
+    return update(User).where(User.id == user_id).values(**values).returning(User.change_seq)
+
+
+async def reserve_change_seqs(
+    db: AsyncSession, user_id: int, count: int = 1, tasks: int = 0, completed: int = 0
+) -> int:
+    """Claim ``count`` consecutive change sequence numbers and return the first.
+
+    The increment locks the user's row until commit, so a user's changes
+    become visible in sequence order and a sync token never skips a write
+    that commits later. ``tasks`` and ``completed`` adjust the user's task
+    counters in the same statement, so a write touches that row only once.
+    """
+    last = await db.scalar(_reserve_statement(user_id, count, tasks, completed))
+    return last - count + 1
+
+
+def _tombstone_rows(owner_id: int, task_ids, first_seq: int) -> list[dict]:
+    return [
+        {"task_id": task_id, "owner_id": owner_id, "change_seq": first_seq + offset}
+        for offset, task_id in enumerate(task_ids)
+    ]
+
+
+async def record_tombstones(
+    db: AsyncSession, owner_id: int, task_ids: list[int], completed: int = 0
+) -> None:
+    # Also takes the tasks off the owner's counters; ``completed`` is how many
+    # of them were done.
+    if task_ids:
+        first = await reserve_change_seqs(
+            db, owner_id, len(task_ids), tasks=-len(task_ids), completed=-completed
+        )
+        await db.execute(insert(TaskTombstone), _tombstone_rows(owner_id, task_ids, first))
+
+
+# Unit-of-work writes (db.add / db.delete / attribute changes) are sequenced
+# here, before they hit the database. Statement-level writes reserve their own
+# sequence numbers.
+@event.listens_for(Session, "before_flush")
+def _sequence_flushed_tasks(session: Session, flush_context, instances) -> None:
+    changed: dict[int, list[Task]] = {}
+    deleted: dict[int, list[int]] = {}
+
+    for obj in session.new:
+        if isinstance(obj, Task):
+            changed.setdefault(obj.owner_id, []).append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Task) and session.is_modified(obj):
+            changed.setdefault(obj.owner_id, []).append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            deleted.setdefault(obj.owner_id, []).append(obj.id)
+
+    if not changed and not deleted:
+        return
+
+    connection = session.connection()
+    for owner_id, tasks in changed.items():
+        first = connection.scalar(_reserve_statement(owner_id, len(tasks))) - len(tasks) + 1
+        for offset, task in enumerate(tasks):
+            task.change_seq = first + offset
+    for owner_id, task_ids in deleted.items():
+        first = connection.scalar(_reserve_statement(owner_id, len(task_ids))) - len(task_ids) + 1
+        connection.execute(insert(TaskTombstone), _tombstone_rows(owner_id, task_ids, first))
+
+
+async def compact_tombstones(
+    db: AsyncSession, retention: timedelta, batch_size: int = 1000
+) -> int:
+    """Delete tombstones older than ``retention``.
+
+    Each user's ``tombstone_floor`` is raised past the compacted sequence
+    numbers, so sync tokens older than the floor are rejected and those
+    clients fall back to a full refetch.
+    """
+    cutoff: datetime = utcnow() - retention
+    raise_floor = (
+        update(User.__table__)
+        .where(User.__table__.c.id == bindparam("uid"))
+        .values(
+            tombstone_floor=case(
+                (User.__table__.c.tombstone_floor < bindparam("seq"), bindparam("seq")),
+                else_=User.__table__.c.tombstone_floor,
+            )
+        )
+    )
+
+    compacted = 0
+    while True:
+        chunk = (
+            select(TaskTombstone.id)
+            .where(TaskTombstone.deleted_at < cutoff)
+            .order_by(TaskTombstone.id)
+            .limit(batch_size)
+        )
+        result = await db.execute(
+            delete(TaskTombstone)
+            .where(TaskTombstone.id.in_(chunk))
+            .returning(TaskTombstone.owner_id, TaskTombstone.change_seq)
+        )
+        rows = result.all()
+        if not rows:
+            return compacted
+
+        floors: dict[int, int] = {}
+        for owner_id, change_seq in rows:
+            floors[owner_id] = max(floors.get(owner_id, 0), change_seq)
+        await db.execute(
+            raise_floor, [{"uid": uid, "seq": seq} for uid, seq in floors.items()]
+        )
+        await db.commit()
+        compacted += len(rows)
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+from datetime import timedelta
+
+from app.archive import archive_completed_tasks
+from app.changes import compact_tombstones
+from app.config import settings
+from app.counters import repair_task_counters
+from app.migrations import migrate
+from app.database import async_session, engine
+from app.importer import (
+    import_tasks,
+    import_users,
+    read_records,
+    synthetic_tasks,
+    synthetic_users,
+)
+
+
+async def _migrate() -> None:
+    applied = await migrate(engine)
+    print(f"Applied {len(applied)} migrations" + (f": {', '.join(applied)}" if applied else ""))
+
+
+async def _repair_counters(batch_size: int) -> None:
+    async with async_session() as session:
+        repaired = await repair_task_counters(session, batch_size=batch_size)
+    print(f"Repaired task counters for {repaired} users")
+
+
+async def _compact_tombstones(retention_days: int, batch_size: int) -> None:
+    async with async_session() as session:
+        compacted = await compact_tombstones(
+            session, timedelta(days=retention_days), batch_size=batch_size
+        )
+    print(f"Compacted {compacted} task tombstones")
+
+
+async def _archive_tasks(older_than_days: int, chunk_size: int) -> None:
+    async with async_session() as session:
+        archived = await archive_completed_tasks(
+            session, timedelta(days=older_than_days), chunk_size=chunk_size
+        )
+    print(f"Archived {archived} completed tasks")
+
+
+async def _import(args: argparse.Namespace) -> None:
+    if args.synthetic_users:
+        users = synthetic_users(args.synthetic_users, args.password)
+        tasks = synthetic_tasks(args.synthetic_users, args.tasks_per_user)
+    else:
+        users = read_records(args.users) if args.users else None
+        tasks = read_records(args.tasks) if args.tasks else None
+
+    async with async_session() as session:
+        if users is not None:
+            stats = await import_users(
+                session, users, batch_size=args.batch_size, hash_workers=args.hash_workers
+            )
+            print(f"Imported {stats.rows} users ({stats.rows_per_second:,.0f} rows/sec)")
+        if tasks is not None:
+            stats = await import_tasks(session, tasks, batch_size=args.batch_size)
+            print(f"Imported {stats.rows} tasks ({stats.rows_per_second:,.0f} rows/sec)")
+            if stats.skipped:
+                print(f"Skipped {stats.skipped} tasks with unknown owners")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("migrate", help="Apply pending schema migrations")
+
+    repair = commands.add_parser(
+        "repair-counters", help="Recompute per-user task counters from the tasks table"
+    )
+    repair.add_argument("--batch-size", type=int, default=1000)
+
+    compact = commands.add_parser(
+        "compact-tombstones", help="Delete task tombstones older than the retention period"
+    )
+    compact.add_argument(
+        "--retention-days", type=int, default=settings.tombstone_retention_days
+    )
+    compact.add_argument("--batch-size", type=int, default=1000)
+
+    archive = commands.add_parser(
+        "archive-tasks", help="Move old completed tasks into the tasks_archive table"
+    )
+    archive.add_argument("--older-than-days", type=int, default=settings.archive_after_days)
+    archive.add_argument("--chunk-size", type=int, default=settings.archive_chunk_size)
+
+    load = commands.add_parser(
+        "import", help="Bulk-load users and tasks from CSV/NDJSON files or synthetic data"
+    )
+    load.add_argument("--users", help="CSV or NDJSON file with email,password")
+    load.add_argument(
+        "--tasks",
+        help="CSV or NDJSON file with title,description,completed and owner_id or owner_email",
+    )
+    load.add_argument("--synthetic-users", type=int, default=0)
+    load.add_argument("--tasks-per-user", type=int, default=100)
+    load.add_argument("--password", default="password123", help="password for synthetic users")
+    load.add_argument("--batch-size", type=int, default=5000)
+    load.add_argument("--hash-workers", type=int, default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        asyncio.run(_migrate())
+    elif args.command == "repair-counters":
+        asyncio.run(_repair_counters(args.batch_size))
+    elif args.command == "compact-tombstones":
+        asyncio.run(_compact_tombstones(args.retention_days, args.batch_size))
+    elif args.command == "archive-tasks":
+        asyncio.run(_archive_tasks(args.older_than_days, args.chunk_size))
+    elif args.command == "import":
+        asyncio.run(_import(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from sqlalchemy import and_, event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.models.user import User
+
+
+def _counter_update(user_id: int, tasks: int, completed: int):
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            task_count=User.task_count + tasks,
+            completed_count=User.completed_count + completed,
+        )
+    )
+
+
+# Task writes that go through the unit of work (db.add / db.delete / attribute
+# changes) are counted here, in the same flush. Statement-level writes bypass
+# flush events; they move the counters through app.changes.reserve_change_seqs,
+# in the same UPDATE that sequences them.
+@event.listens_for(Session, "after_flush")
+def _count_flushed_tasks(session: Session, flush_context) -> None:
+    deltas: dict[int, list[int]] = {}
+
+    for obj in session.new:
+        if isinstance(obj, Task):
+            delta = deltas.setdefault(obj.owner_id, [0, 0])
+            delta[0] += 1
+            delta[1] += int(bool(obj.completed))
+
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            delta = deltas.setdefault(obj.owner_id, [0, 0])
+            delta[0] -= 1
+            delta[1] -= int(bool(obj.completed))
+
+    for obj in session.dirty:
+        if isinstance(obj, Task) and obj not in session.deleted:
+            history = inspect(obj).attrs.completed.history
+            if history.has_changes() and history.deleted:
+                before, after = bool(history.deleted[0]), bool(obj.completed)
+                if before != after:
+                    delta = deltas.setdefault(obj.owner_id, [0, 0])
+                    delta[1] += 1 if after else -1
+
+    connection = session.connection()
+    for user_id, (tasks, completed) in deltas.items():
+        if tasks or completed:
+            connection.execute(_counter_update(user_id, tasks, completed))
+
+
+async def repair_task_counters(db: AsyncSession, batch_size: int = 1000) -> int:
+    task_count = (
+        select(func.count())
+        .where(Task.owner_id == User.id)
+        .scalar_subquery()
+    )
+    completed_count = (
+        select(func.count())
+        .where(Task.owner_id == User.id, Task.completed.is_(True))
+        .scalar_subquery()
+    )
+
+    repaired = 0
+    last_id = 0
+    while True:
+        result = await db.scalars(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        )
+        user_ids = result.all()
+        if not user_ids:
+            break
+
+        await db.execute(
+            update(User)
+            .where(and_(User.id >= user_ids[0], User.id <= user_ids[-1]))
+            .values(task_count=task_count, completed_count=completed_count)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+        repaired += len(user_ids)
+        last_id = user_ids[-1]
+
+    return repaired
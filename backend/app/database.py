@@ -1,11 +1,61 @@
+import itertools
+import math
+import time
 from collections.abc import AsyncGenerator
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.instrumentation import instrument_engine
+from app.metrics import Histogram
 
-engine = create_async_engine(settings.database_url, echo=settings.debug)
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # _do_get blocks (via greenlet) while the pool is exhausted, so timing it
+    # gives the checkout wait and counting callers inside it gives waiters.
+    # Kept per pool so replica pools don't mix into the primary's numbers.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiters = 0
+        self.checkout_wait = Histogram()
+
+    def _do_get(self):
+        self.waiters += 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.waiters -= 1
+            self.checkout_wait.observe(time.perf_counter() - start)
+
+
+def engine_options(database_url: str) -> dict:
+    options = {"echo": settings.debug}
+    if database_url.startswith("sqlite"):
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    if database_url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
+
+engine = create_async_engine(settings.database_url, **engine_options(settings.database_url))
+instrument_engine(engine.sync_engine)
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -14,6 +64,115 @@ class Base(DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session() as session:
+class SessionRouter:
+    """Sends read-only requests to replicas and everything else to the primary.
+
+    A client that wrote within ``sticky_seconds`` is sent to the primary so
+    replication lag never hides its own writes from it. The write time travels
+    with the client in a cookie (see ReadYourWritesMiddleware), so the pin
+    holds whichever worker or host serves the next request.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replicas: list[async_sessionmaker[AsyncSession]] | None = None,
+        sticky_seconds: float = 5.0,
+    ):
+        self.primary = primary
+        self.replicas = replicas or []
+        self.sticky_seconds = sticky_seconds
+        self._next_replica = itertools.cycle(self.replicas)
+
+    def factory_for(
+        self, method: str, last_write: float | None = None
+    ) -> async_sessionmaker[AsyncSession]:
+        if not self.replicas or method not in READ_METHODS:
+            return self.primary
+        if last_write is not None and time.time() - last_write < self.sticky_seconds:
+            return self.primary
+        return next(self._next_replica)
+
+
+replica_engines = [
+    create_async_engine(url, **engine_options(url)) for url in settings.database_replica_urls
+]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine.sync_engine)
+
+session_router = SessionRouter(
+    async_session,
+    [
+        async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+        for replica_engine in replica_engines
+    ],
+    sticky_seconds=settings.read_your_writes_seconds,
+)
+
+
+LAST_WRITE_COOKIE = "last_write"
+
+
+class ReadYourWritesMiddleware:
+    # Stamps successful writes with the time they happened. Forging the cookie
+    # only ever sends a client's reads to the primary.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] in READ_METHODS
+            or not session_router.replicas
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; "
+                    f"Max-Age={math.ceil(session_router.sticky_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"set-cookie", cookie.encode())
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def _last_write(request: Request) -> float | None:
+    try:
+        return float(request.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with session_router.factory_for(request.method, _last_write(request))() as session:
         yield session
+
+
+# Streaming responses outlive the request-scoped session from get_db, so
+# they open their own sessions from this factory instead.
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    return async_session
+
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"pool": type(pool).__name__}
+
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "waiters": pool.waiters,
+        "checkout_wait_seconds": pool.checkout_wait.snapshot(),
+    }
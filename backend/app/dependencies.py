@@ -3,12 +3,32 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import TTLCache
+from app.config import settings
 from app.database import get_db
+from app.models.group import GroupMembership
 from app.models.user import User
+from app.revocation import revocation_store
 from app.security import decode_token
 
 bearer_scheme = HTTPBearer()
 
+# Holds (id, email) snapshots, never ORM instances, so entries can't leak
+# session state between requests. Call user_cache.invalidate(user_id) after
+# changing or deleting a user.
+user_cache = TTLCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl_seconds,
+    enabled=settings.user_cache_enabled,
+)
+
+# Maps (group_id, user_id) to the member's role. Only memberships are cached;
+# call membership_cache.invalidate((group_id, user_id)) after changing one.
+membership_cache = TTLCache(
+    maxsize=settings.membership_cache_size,
+    ttl=settings.membership_cache_ttl_seconds,
+)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
@@ -23,7 +43,17 @@ async def get_current_user(
             detail="Invalid or expired token",
         )
 
+    if revocation_store.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+
     user_id = int(payload["sub"])
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return User(id=cached[0], email=cached[1])
+
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
 
@@ -33,4 +63,20 @@ async def get_current_user(
             detail="User not found",
         )
 
+    user_cache.set(user.id, (user.id, user.email))
     return user
+
+
+async def get_group_role(db: AsyncSession, group_id: int, user_id: int) -> str | None:
+    role = membership_cache.get((group_id, user_id))
+    if role is not None:
+        return role
+
+    role = await db.scalar(
+        select(GroupMembership.role).where(
+            GroupMembership.group_id == group_id, GroupMembership.user_id == user_id
+        )
+    )
+    if role is not None:
+        membership_cache.set((group_id, user_id), role)
+    return role
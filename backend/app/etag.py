@@ -0,0 +1,42 @@
+import hashlib
+
+
+def task_etag(task_id: int, version: int) -> str:
+    return f'"t{task_id}.{version}"'
+
+
+def list_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"l{digest}"'
+
+
+def _split(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    if not if_none_match:
+        return False
+    tags = _split(if_none_match)
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def if_match_versions(if_match: str | None, task_id: int) -> set[int] | None:
+    # None means no precondition. If-Match requires strong comparison, so
+    # weak tags never match.
+    if not if_match:
+        return None
+    tags = _split(if_match)
+    if "*" in tags:
+        return None
+
+    prefix = f'"t{task_id}.'
+    versions = set()
+    for tag in tags:
+        if tag.startswith(prefix) and tag.endswith('"'):
+            try:
+                versions.add(int(tag[len(prefix):-1]))
+            except ValueError:
+                pass
+    return versions
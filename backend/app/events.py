@@ -0,0 +1,219 @@
+import asyncio
+import json
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "task_events"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+MAX_NOTIFY_PAYLOAD = 7900
+
+
+class Subscription:
+    __slots__ = ("user_id", "queue")
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+
+
+class EventBackend:
+    # Carries published events to every worker's broker, which then fans them
+    # out to local subscribers.
+    async def start(self, broker: "TaskEventBroker") -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(
+        self, broker: "TaskEventBroker", user_id: int, events: list[dict]
+    ) -> None:
+        raise NotImplementedError
+
+
+class InMemoryEventBackend(EventBackend):
+    async def publish(
+        self, broker: "TaskEventBroker", user_id: int, events: list[dict]
+    ) -> None:
+        for event in events:
+            broker.deliver(user_id, event)
+
+
+def notify_payloads(user_id: int, events: list[dict]) -> list[str]:
+    """Pack a user's events into as few NOTIFY payloads as fit the size limit."""
+
+    def envelope(batch: list[str]) -> str:
+        return f'{{"user_id": {user_id}, "events": [{", ".join(batch)}]}}'
+
+    # json.dumps escapes non-ASCII, so string length is the byte length.
+    room = MAX_NOTIFY_PAYLOAD - len(envelope([]))
+    payloads: list[str] = []
+    batch: list[str] = []
+    used = 0
+    for event in events:
+        encoded = json.dumps(event)
+        if len(encoded) > room:
+            # Too large to notify in full; subscribers refetch the task by id.
+            encoded = json.dumps({"type": event["type"], "id": event["task"]["id"]})
+        if batch and used + len(encoded) + 2 > room:
+            payloads.append(envelope(batch))
+            batch, used = [], 0
+        used += len(encoded) + (2 if batch else 0)
+        batch.append(encoded)
+    if batch:
+        payloads.append(envelope(batch))
+    return payloads
+
+
+class PostgresEventBackend(EventBackend):
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        ping_interval: float = 15.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        self.engine = engine
+        self.ping_interval = ping_interval
+        self.max_reconnect_delay = max_reconnect_delay
+        self._listener: asyncio.Task | None = None
+
+    async def connect(self):
+        import asyncpg
+
+        # LISTEN holds its connection for the life of the process, so it gets
+        # one of its own instead of a slot in the request pool.
+        url = self.engine.url.set(drivername="postgresql")
+        return await asyncpg.connect(url.render_as_string(hide_password=False))
+
+    async def start(self, broker: "TaskEventBroker") -> None:
+        self._listener = asyncio.create_task(self._listen_forever(broker))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def _listen_forever(self, broker: "TaskEventBroker") -> None:
+        def on_notify(connection, pid, channel, payload):
+            message = json.loads(payload)
+            for event in message["events"]:
+                broker.deliver(message["user_id"], event)
+
+        first_delay = min(1.0, self.max_reconnect_delay)
+        delay = first_delay
+        reconnecting = False
+        while True:
+            try:
+                connection = await self.connect()
+            except Exception:
+                logger.exception("Failed to open the task event connection")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(NOTIFY_CHANNEL, on_notify)
+                delay = first_delay
+                if reconnecting:
+                    # Anything notified while disconnected is gone.
+                    broker.resync_all()
+                reconnecting = True
+                # A half-open socket never reports termination, so the
+                # connection is also pinged between waits.
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self.ping_interval)
+                    except asyncio.TimeoutError:
+                        await asyncio.wait_for(connection.fetchval("SELECT 1"), self.ping_interval)
+            except Exception:
+                logger.exception("Lost the task event connection")
+            finally:
+                if not connection.is_closed():
+                    connection.terminate()
+            logger.warning("Reconnecting the task event connection")
+
+    async def publish(
+        self, broker: "TaskEventBroker", user_id: int, events: list[dict]
+    ) -> None:
+        # One transaction and one statement for the whole batch.
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "SELECT pg_notify(:channel, payload) "
+                    "FROM unnest(CAST(:payloads AS text[])) AS payload"
+                ),
+                {"channel": NOTIFY_CHANNEL, "payloads": notify_payloads(user_id, events)},
+            )
+
+
+class TaskEventBroker:
+    def __init__(self, backend: EventBackend, queue_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[Subscription]] = {}
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    @staticmethod
+    def _resync(subscription: Subscription) -> None:
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait({"type": "resync"})
+
+    def deliver(self, user_id: int, event: dict) -> None:
+        for subscription in self._subscribers.get(user_id, ()):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A slow consumer loses its backlog and is told to refetch,
+                # instead of letting its queue grow without bound.
+                self._resync(subscription)
+
+    def resync_all(self) -> None:
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                self._resync(subscription)
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        await self.publish_many(user_id, [event])
+
+    async def publish_many(self, user_id: int, events: list[dict]) -> None:
+        if not events:
+            return
+        try:
+            await self.backend.publish(self, user_id, events)
+        except Exception:
+            logger.exception("Failed to publish task events")
+
+
+def create_broker(engine: AsyncEngine, backend: str, queue_size: int) -> TaskEventBroker:
+    if backend == "postgres":
+        backend = PostgresEventBackend(engine, ping_interval=settings.event_keepalive_seconds)
+        return TaskEventBroker(backend, queue_size)
+    return TaskEventBroker(InMemoryEventBackend(), queue_size)
+
+
+event_broker = create_broker(engine, settings.event_backend, settings.event_queue_size)
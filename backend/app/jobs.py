@@ -0,0 +1,235 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from datetime import timedelta
+
+from sqlalchemy import case, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.job import PENDING_PREDICATE, PENDING_STATUSES, Job
+from app.timeutils import utcnow
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, dict], Awaitable[dict | None]]
+
+handlers: dict[str, JobHandler] = {}
+
+# Id of the job the current handler is running for, used by report_progress.
+current_job_id: ContextVar[int | None] = ContextVar("current_job_id", default=None)
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    def register(func: JobHandler) -> JobHandler:
+        handlers[kind] = func
+        return func
+
+    return register
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: dict,
+    owner_id: int | None = None,
+    dedupe_key: str | None = None,
+) -> Job:
+    """Queue a job and commit.
+
+    With a ``dedupe_key``, a job already queued or running under that key is
+    returned instead of a new one. The unique index on pending keys makes this
+    hold across processes, not just within one.
+    """
+    if dedupe_key is None:
+        job = Job(
+            kind=kind,
+            payload=payload,
+            owner_id=owner_id,
+            max_attempts=settings.job_max_attempts,
+        )
+        db.add(job)
+        await db.commit()
+        return job
+
+    postgres = db.get_bind().dialect.name == "postgresql"
+    statement = (
+        (postgresql.insert if postgres else sqlite.insert)(Job)
+        .values(
+            kind=kind,
+            payload=payload,
+            owner_id=owner_id,
+            max_attempts=settings.job_max_attempts,
+            dedupe_key=dedupe_key,
+        )
+        .on_conflict_do_nothing(
+            index_elements=[Job.dedupe_key], index_where=text(PENDING_PREDICATE)
+        )
+        .returning(Job)
+    )
+    pending = select(Job).where(Job.dedupe_key == dedupe_key, Job.status.in_(PENDING_STATUSES))
+    while True:
+        job = (await db.scalars(statement)).one_or_none()
+        if job is None:
+            # Lost the race: the pending job may also have finished since.
+            job = await db.scalar(pending)
+        if job is not None:
+            await db.commit()
+            return job
+
+
+async def report_progress(db: AsyncSession, progress: dict) -> None:
+    # Written to the job's result alongside the handler's own changes, so it
+    # becomes visible when the handler commits; the final result replaces it.
+    job_id = current_job_id.get()
+    if job_id is not None:
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(result=progress)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def reclaim_stale_jobs(db: AsyncSession) -> None:
+    # Jobs whose worker died mid-run stop renewing their lease; put them back
+    # in the queue, or fail them once they are out of attempts.
+    cutoff = utcnow() - timedelta(seconds=settings.job_lease_seconds)
+    await db.execute(
+        update(Job)
+        .where(Job.status == "running", Job.updated_at < cutoff)
+        .values(
+            status=case((Job.attempts < Job.max_attempts, "queued"), else_="failed"),
+            error="Worker lease expired",
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def claim_job(db: AsyncSession) -> Job | None:
+    await reclaim_stale_jobs(db)
+    now = utcnow()
+    ready = (
+        select(Job.id)
+        .where(Job.status == "queued", Job.run_at <= now)
+        .order_by(Job.run_at, Job.id)
+        .limit(1)
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Concurrent workers skip rows another worker already holds.
+        ready = ready.with_for_update(skip_locked=True)
+        job_id = await db.scalar(ready)
+        if job_id is None:
+            await db.commit()
+            return None
+        target = Job.id == job_id
+    else:
+        # SQLite serializes writers, so a single UPDATE ... WHERE id = (subquery)
+        # claims atomically.
+        target = Job.id == ready.scalar_subquery()
+
+    result = await db.scalars(
+        update(Job)
+        .where(target, Job.status == "queued")
+        .values(status="running", attempts=Job.attempts + 1, updated_at=now)
+        .returning(Job)
+        .execution_options(populate_existing=True)
+    )
+    job = result.one_or_none()
+    await db.commit()
+    return job
+
+
+async def run_job(db: AsyncSession, job: Job) -> None:
+    # Rolling back a failed handler expires `job`, and reloading it would need
+    # IO outside the greenlet; everything needed afterwards is read up front.
+    job_id, kind, attempts, max_attempts = job.id, job.kind, job.attempts, job.max_attempts
+    handler = handlers.get(kind)
+    token = current_job_id.set(job_id)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler for job kind {kind!r}")
+        result = await handler(db, job.payload)
+    except Exception as exc:
+        await db.rollback()
+        logger.exception("Job %s (%s) failed", job_id, kind)
+        values = {"error": repr(exc)}
+        if attempts < max_attempts:
+            delay = settings.job_retry_backoff_seconds * 2 ** (attempts - 1)
+            values |= {"status": "queued", "run_at": utcnow() + timedelta(seconds=delay)}
+        else:
+            values |= {"status": "failed"}
+    else:
+        values = {"status": "succeeded", "result": result, "error": None}
+    finally:
+        current_job_id.reset(token)
+
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+class JobWorker:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        concurrency: int,
+        poll_interval: float,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: list[asyncio.Task] = []
+
+    async def run_once(self) -> bool:
+        async with self.session_factory() as session:
+            job = await claim_job(session)
+            if job is None:
+                return False
+            heartbeat = asyncio.create_task(self._renew_lease(job.id))
+            try:
+                await run_job(session, job)
+            finally:
+                heartbeat.cancel()
+        return True
+
+    async def _renew_lease(self, job_id: int) -> None:
+        # Uses its own session: the handler's session may be mid-transaction.
+        while True:
+            await asyncio.sleep(settings.job_lease_seconds / 3)
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.status == "running")
+                        .values(updated_at=utcnow())
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception("Failed to renew lease for job %s", job_id)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                ran = await self.run_once()
+            except Exception:
+                logger.exception("Job worker iteration failed")
+                ran = False
+            if not ran:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
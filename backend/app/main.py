@@ -1,21 +1,62 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy import text
 
-from app.database import Base, engine
+from app.archive import schedule_archival_forever
+from app.config import settings
+from app.database import ReadYourWritesMiddleware, async_session, engine, pool_stats
+from app.dependencies import user_cache
+from app.events import event_broker
+from app.instrumentation import MetricsMiddleware
+from app.metrics import registry, render_histogram, render_prometheus
 from app.models.user import User  # noqa: F401 - needed for metadata
 from app.models.task import Task  # noqa: F401 - needed for metadata
-from app.routers import auth, tasks
+from app.models.revoked_token import RevokedToken  # noqa: F401 - needed for metadata
+from app.models.job import Job  # noqa: F401 - needed for metadata
+from app.models.task_tombstone import TaskTombstone  # noqa: F401 - needed for metadata
+from app.models.task_archive import TaskArchive  # noqa: F401 - needed for metadata
+from app.models.group import Group  # noqa: F401 - needed for metadata
+from app.jobs import JobWorker
+from app.migrations import migrate
+from app.ratelimit import rate_limiter
+from app.revocation import revocation_store
+from app.routers import auth, groups, jobs, tasks
+from app.security import PasswordHasherBusy, password_hasher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await migrate(engine)
+
+    async with async_session() as session:
+        await revocation_store.load(session)
+    revocation_refresh = asyncio.create_task(
+        revocation_store.refresh_forever(async_session, settings.revocation_refresh_seconds)
+    )
+    job_worker = JobWorker(
+        async_session, settings.job_workers, settings.job_poll_interval_seconds
+    )
+    job_worker.start()
+    archival = None
+    if settings.archive_interval_seconds > 0:
+        archival = asyncio.create_task(
+            schedule_archival_forever(async_session, settings.archive_interval_seconds)
+        )
+    await event_broker.backend.start(event_broker)
+
     yield
 
+    await event_broker.backend.stop()
+    await job_worker.stop()
+    revocation_refresh.cancel()
+    if archival is not None:
+        archival.cancel()
+    password_hasher.shutdown()
+
 
 app = FastAPI(title="Simple Todo API", version="0.1.0", lifespan=lifespan)
 
@@ -26,9 +67,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(tasks.router)
+app.include_router(jobs.router)
+app.include_router(groups.router)
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.get("/health")
@@ -44,3 +98,49 @@ async def health_check_db():
         return {"status": "healthy", "database": "connected"}
     except Exception:
         return {"status": "unhealthy", "database": "disconnected"}
+
+
+@app.get("/health/db/pool")
+async def health_check_db_pool():
+    return pool_stats()
+
+
+@app.get("/health/cache")
+async def health_check_cache():
+    return {"user_cache": user_cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    stats = pool_stats()
+    lines = [render_prometheus(registry).rstrip("\n")]
+    if "checked_out" in stats:
+        lines += [
+            "# TYPE db_pool_checked_out gauge",
+            f"db_pool_checked_out {stats['checked_out']}",
+            "# TYPE db_pool_overflow gauge",
+            f"db_pool_overflow {stats['overflow']}",
+            "# TYPE db_pool_waiters gauge",
+            f"db_pool_waiters {stats['waiters']}",
+            "# TYPE db_pool_checkout_wait_seconds histogram",
+            *render_histogram(
+                "db_pool_checkout_wait_seconds", engine.pool.checkout_wait
+            ),
+        ]
+    lines.append("# TYPE rate_limit_rejected_total counter")
+    lines += [
+        f'rate_limit_rejected_total{{scope="{scope}"}} {count}'
+        for scope, count in sorted(rate_limiter.rejected.items())
+    ]
+    lines += [
+        "# TYPE task_event_subscribers gauge",
+        f"task_event_subscribers {event_broker.subscriber_count()}",
+    ]
+    cache = user_cache.stats()
+    lines += [
+        "# TYPE user_cache_hits_total counter",
+        f"user_cache_hits_total {cache['hits']}",
+        "# TYPE user_cache_misses_total counter",
+        f"user_cache_misses_total {cache['misses']}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,112 @@
+import bisect
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((str(bound), running))
+        result.append(("+Inf", self.count))
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class Registry:
+    def __init__(self):
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.db_statements: dict[tuple[str, str], int] = {}
+        self.db_seconds: dict[tuple[str, str], float] = {}
+
+    def record_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        statements: int,
+        db_seconds: float,
+    ) -> None:
+        key = (method, route)
+        self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(seconds)
+        self.db_statements[key] = self.db_statements.get(key, 0) + statements
+        self.db_seconds[key] = self.db_seconds.get(key, 0.0) + db_seconds
+
+    def clear(self) -> None:
+        self.requests.clear()
+        self.latency.clear()
+        self.db_statements.clear()
+        self.db_seconds.clear()
+
+
+def _labels(**labels) -> str:
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_histogram(name: str, histogram: Histogram, **labels) -> list[str]:
+    lines = [
+        f"{name}_bucket{_labels(**labels, le=bound)} {count}"
+        for bound, count in histogram.cumulative()
+    ]
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def render_prometheus(registry: Registry) -> str:
+    lines = [
+        "# TYPE http_requests_total counter",
+        *(
+            f"http_requests_total{_labels(method=m, route=r, status=s)} {count}"
+            for (m, r, s), count in sorted(registry.requests.items())
+        ),
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), histogram in sorted(registry.latency.items()):
+        lines.extend(
+            render_histogram("http_request_duration_seconds", histogram, method=method, route=route)
+        )
+
+    lines.append("# TYPE db_statements_total counter")
+    lines.extend(
+        f"db_statements_total{_labels(method=m, route=r)} {count}"
+        for (m, r), count in sorted(registry.db_statements.items())
+    )
+    lines.append("# TYPE db_statement_duration_seconds_total counter")
+    lines.extend(
+        f"db_statement_duration_seconds_total{_labels(method=m, route=r)} {seconds}"
+        for (m, r), seconds in sorted(registry.db_seconds.items())
+    )
+    return "\n".join(lines) + "\n"
+
+
+registry = Registry()
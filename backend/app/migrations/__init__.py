@@ -0,0 +1,138 @@
+import hashlib
+import importlib
+import logging
+import pkgutil
+from contextlib import asynccontextmanager
+from types import ModuleType
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.timeutils import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_lock, so concurrently booting workers take
+# turns applying migrations.
+LOCK_KEY = 7_301_922
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(255), nullable=False),
+    Column("fingerprint", String(64), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+class Migration:
+    # Wraps a module in app/migrations/versions named v<NNNN>_<name>. Modules
+    # define ``async def upgrade(conn)`` and may set TRANSACTIONAL = False to
+    # run on an autocommit connection, which Postgres needs for
+    # CREATE INDEX CONCURRENTLY.
+    def __init__(self, module: ModuleType):
+        prefix, _, self.name = module.__name__.rpartition(".")[2].partition("_")
+        self.version = int(prefix.removeprefix("v"))
+        self.module = module
+
+    @property
+    def transactional(self) -> bool:
+        return getattr(self.module, "TRANSACTIONAL", True)
+
+    async def upgrade(self, conn: AsyncConnection) -> None:
+        await self.module.upgrade(conn)
+
+
+def load_migrations(package: str = "app.migrations.versions") -> list[Migration]:
+    module = importlib.import_module(package)
+    migrations = [
+        Migration(importlib.import_module(f"{package}.{info.name}"))
+        for info in pkgutil.iter_modules(module.__path__)
+        if info.name.startswith("v")
+    ]
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+def fingerprint(migrations: list[Migration]) -> str:
+    digest = hashlib.sha256()
+    for migration in migrations:
+        digest.update(f"{migration.version}:{migration.name}\n".encode())
+    return digest.hexdigest()
+
+
+async def stored_fingerprint(engine: AsyncEngine) -> str | None:
+    try:
+        async with engine.connect() as conn:
+            return await conn.scalar(
+                select(schema_migrations.c.fingerprint)
+                .order_by(schema_migrations.c.version.desc())
+                .limit(1)
+            )
+    except DBAPIError:
+        # No schema_migrations table yet: a fresh or pre-migration database.
+        return None
+
+
+@asynccontextmanager
+async def _migration_lock(engine: AsyncEngine):
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": LOCK_KEY})
+        try:
+            yield
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+
+
+async def _record(conn: AsyncConnection, migration: Migration, fingerprint: str) -> None:
+    await conn.execute(
+        insert(schema_migrations).values(
+            version=migration.version,
+            name=migration.name,
+            fingerprint=fingerprint,
+            applied_at=utcnow(),
+        )
+    )
+
+
+async def migrate(engine: AsyncEngine, migrations: list[Migration] | None = None) -> list[str]:
+    """Apply pending migrations and return their names.
+
+    When the fingerprint stored with the latest applied migration matches
+    the code's, this is a single indexed read with no reflection, which is
+    what every worker boot after the first pays.
+    """
+    migrations = load_migrations() if migrations is None else migrations
+    if await stored_fingerprint(engine) == fingerprint(migrations):
+        return []
+
+    applied_names = []
+    async with _migration_lock(engine):
+        async with engine.begin() as conn:
+            await conn.run_sync(schema_migrations.create, checkfirst=True)
+            applied = set((await conn.scalars(select(schema_migrations.c.version))).all())
+
+        for index, migration in enumerate(migrations):
+            if migration.version in applied:
+                continue
+
+            logger.info("Applying migration %04d_%s", migration.version, migration.name)
+            prefix_fingerprint = fingerprint(migrations[: index + 1])
+            if migration.transactional:
+                async with engine.begin() as conn:
+                    await migration.upgrade(conn)
+                    await _record(conn, migration, prefix_fingerprint)
+            else:
+                async with engine.connect() as conn:
+                    conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    await migration.upgrade(conn)
+                    await _record(conn, migration, prefix_fingerprint)
+            applied_names.append(migration.name)
+
+    return applied_names
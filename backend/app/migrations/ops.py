@@ -0,0 +1,77 @@
+from sqlalchemy import Column, MetaData, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateColumn
+
+# Migrations must also bring forward databases created by create_all before
+# migrations existed, so every operation here is a no-op when its object is
+# already present. Reflection is fine on this path; it only runs when the
+# stored schema fingerprint is out of date.
+
+
+async def has_table(conn: AsyncConnection, table: str) -> bool:
+    return await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(table))
+
+
+async def has_column(conn: AsyncConnection, table: str, column: str) -> bool:
+    columns = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_columns(table))
+    return any(existing["name"] == column for existing in columns)
+
+
+async def create_tables(conn: AsyncConnection, metadata: MetaData) -> None:
+    await conn.run_sync(metadata.create_all, checkfirst=True)
+
+
+async def add_column(conn: AsyncConnection, table: str, column: Column) -> bool:
+    if await has_column(conn, table, column.name):
+        return False
+
+    spec = str(CreateColumn(column).compile(dialect=conn.dialect))
+    for foreign_key in column.foreign_keys:
+        table_name, _, column_name = foreign_key.target_fullname.partition(".")
+        spec += f" REFERENCES {table_name} ({column_name})"
+    await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {spec}"))
+    return True
+
+
+async def create_index(
+    conn: AsyncConnection,
+    name: str,
+    table: str,
+    columns: list[str],
+    postgresql_where: str | None = None,
+    sqlite_where: str | None = None,
+    unique: bool = False,
+    postgresql_using: str | None = None,
+) -> None:
+    """Create an index if it doesn't exist.
+
+    On Postgres the index is built CONCURRENTLY so writes to a large table
+    keep flowing; that requires a migration with TRANSACTIONAL = False. A
+    build interrupted halfway leaves an invalid index behind, which is
+    dropped and rebuilt.
+    """
+    where = using = ""
+    if conn.dialect.name == "postgresql":
+        invalid = await conn.scalar(
+            text(
+                "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        )
+        if invalid:
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        create = "CREATE {}INDEX CONCURRENTLY IF NOT EXISTS"
+        if postgresql_where:
+            where = f" WHERE {postgresql_where}"
+        if postgresql_using:
+            using = f" USING {postgresql_using}"
+    else:
+        create = "CREATE {}INDEX IF NOT EXISTS"
+        if sqlite_where:
+            where = f" WHERE {sqlite_where}"
+
+    create = create.format("UNIQUE " if unique else "")
+    await conn.execute(
+        text(f"{create} {name} ON {table}{using} ({', '.join(columns)}){where}")
+    )
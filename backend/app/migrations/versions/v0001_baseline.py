@@ -0,0 +1,29 @@
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, MetaData, String, Table, Text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import create_tables
+
+# The users and tasks tables as first shipped. Later migrations add to them.
+metadata = MetaData()
+
+Table(
+    "users",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("email", String(255), nullable=False, unique=True, index=True),
+    Column("hashed_password", String(255), nullable=False),
+)
+
+Table(
+    "tasks",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String(255), nullable=False),
+    Column("description", Text, nullable=True),
+    Column("completed", Boolean, nullable=False),
+    Column("owner_id", Integer, ForeignKey("users.id"), nullable=False),
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await create_tables(conn, metadata)
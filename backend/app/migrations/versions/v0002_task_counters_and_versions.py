@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import add_column
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await add_column(conn, "tasks", Column("version", Integer, nullable=False, server_default="1"))
+
+    added = False
+    for column in ("task_count", "completed_count"):
+        added |= await add_column(
+            conn, "users", Column(column, Integer, nullable=False, server_default="0")
+        )
+    if added:
+        await conn.execute(
+            text(
+                "UPDATE users SET "
+                "task_count = (SELECT count(*) FROM tasks WHERE tasks.owner_id = users.id), "
+                "completed_count = (SELECT count(*) FROM tasks "
+                "WHERE tasks.owner_id = users.id AND tasks.completed)"
+            )
+        )
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, Table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import add_column, create_tables
+
+metadata = MetaData()
+
+Table("users", metadata, Column("id", Integer, primary_key=True))
+
+Table(
+    "task_tombstones",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("task_id", Integer, nullable=False),
+    Column("owner_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("change_seq", Integer, nullable=False),
+    Column("deleted_at", DateTime(timezone=True), nullable=False, index=True),
+    Index("ix_task_tombstones_owner_id_change_seq", "owner_id", "change_seq"),
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for column in ("change_seq", "tombstone_floor"):
+        await add_column(conn, "users", Column(column, Integer, nullable=False, server_default="0"))
+    added = await add_column(
+        conn, "tasks", Column("change_seq", Integer, nullable=False, server_default="0")
+    )
+    if added:
+        # Existing tasks get sequence numbers 1..n per owner, so an initial
+        # sync (since=0) still returns them.
+        await conn.execute(
+            text(
+                "UPDATE tasks SET change_seq = numbered.seq FROM ("
+                "SELECT id, ROW_NUMBER() OVER (PARTITION BY owner_id ORDER BY id) AS seq "
+                "FROM tasks) AS numbered WHERE tasks.id = numbered.id"
+            )
+        )
+        await conn.execute(
+            text(
+                "UPDATE users SET change_seq = "
+                "(SELECT count(*) FROM tasks WHERE tasks.owner_id = users.id)"
+            )
+        )
+    await create_tables(conn, metadata)
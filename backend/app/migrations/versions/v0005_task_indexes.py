@@ -0,0 +1,25 @@
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import create_index
+
+# Built CONCURRENTLY on Postgres, so tasks stays writable meanwhile.
+TRANSACTIONAL = False
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await create_index(conn, "ix_tasks_owner_id_id", "tasks", ["owner_id", "id"])
+    await create_index(
+        conn, "ix_tasks_owner_id_completed_id", "tasks", ["owner_id", "completed", "id"]
+    )
+    await create_index(conn, "ix_tasks_owner_id_title_id", "tasks", ["owner_id", "title", "id"])
+    await create_index(
+        conn,
+        "ix_tasks_open_owner_id_title_id",
+        "tasks",
+        ["owner_id", "title", "id"],
+        postgresql_where="NOT completed",
+        sqlite_where="completed = 0",
+    )
+    await create_index(
+        conn, "ix_tasks_owner_id_change_seq", "tasks", ["owner_id", "change_seq"]
+    )
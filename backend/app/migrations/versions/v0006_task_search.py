@@ -0,0 +1,50 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import create_index, has_table
+
+TRANSACTIONAL = False
+
+# Mirrors app.models.task.SEARCH_DOCUMENT; search queries must match it exactly.
+SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+)
+
+_SQLITE_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    if conn.dialect.name == "postgresql":
+        # An expression index rather than a stored tsvector column: adding the
+        # column would rewrite tasks under an ACCESS EXCLUSIVE lock, while the
+        # index builds concurrently.
+        await create_index(
+            conn,
+            "ix_tasks_search_document",
+            "tasks",
+            [SEARCH_DOCUMENT],
+            postgresql_using="GIN",
+        )
+    elif conn.dialect.name == "sqlite" and not await has_table(conn, "tasks_fts"):
+        await conn.execute(
+            text(
+                "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+                "title, description, content='tasks', content_rowid='id')"
+            )
+        )
+        for statement in _SQLITE_TRIGGERS:
+            await conn.execute(text(statement))
+        # Index the rows that existed before the triggers did.
+        await conn.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, MetaData, String, Table
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import add_column, create_tables
+
+metadata = MetaData()
+
+Table("users", metadata, Column("id", Integer, primary_key=True))
+
+Table(
+    "groups",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+)
+
+Table(
+    "group_memberships",
+    metadata,
+    Column("group_id", Integer, ForeignKey("groups.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("role", String(20), nullable=False),
+    Index("ix_group_memberships_user_id", "user_id"),
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await create_tables(conn, metadata)
+    await add_column(
+        conn, "tasks", Column("group_id", Integer, ForeignKey("groups.id"), nullable=True)
+    )
@@ -0,0 +1,9 @@
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import create_index
+
+TRANSACTIONAL = False
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await create_index(conn, "ix_tasks_group_id_id", "tasks", ["group_id", "id"])
@@ -0,0 +1,42 @@
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import add_column, create_tables
+
+metadata = MetaData()
+
+Table("users", metadata, Column("id", Integer, primary_key=True))
+Table("groups", metadata, Column("id", Integer, primary_key=True))
+
+Table(
+    "tasks_archive",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("title", String(255), nullable=False),
+    Column("description", Text, nullable=True),
+    Column("completed", Boolean, nullable=False),
+    Column("owner_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("group_id", Integer, ForeignKey("groups.id"), nullable=True),
+    Column("version", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=True),
+    Column("archived_at", DateTime(timezone=True), nullable=False),
+    Index("ix_tasks_archive_owner_id_id", "owner_id", "id"),
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    # Nullable without a default, so adding it doesn't rewrite tasks. Existing
+    # rows stay NULL and are treated as old enough to archive.
+    await add_column(conn, "tasks", Column("updated_at", DateTime(timezone=True), nullable=True))
+    await create_tables(conn, metadata)
@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import create_index
+
+TRANSACTIONAL = False
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await create_index(
+        conn,
+        "ix_tasks_done_updated_at",
+        "tasks",
+        ["updated_at"],
+        postgresql_where="completed",
+        sqlite_where="completed = 1",
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import create_index
+
+TRANSACTIONAL = False
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    # Postgres only: SQLite serves title prefixes from ix_tasks_owner_id_title_id.
+    if conn.dialect.name == "postgresql":
+        await create_index(
+            conn,
+            "ix_tasks_owner_id_title_pattern",
+            "tasks",
+            ["owner_id", "title text_pattern_ops"],
+        )
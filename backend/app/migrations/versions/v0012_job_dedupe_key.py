@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.ops import add_column, create_index
+
+TRANSACTIONAL = False
+
+PENDING = "status IN ('queued', 'running')"
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await add_column(conn, "jobs", Column("dedupe_key", String(100), nullable=True))
+    await create_index(
+        conn,
+        "ux_jobs_pending_dedupe_key",
+        "jobs",
+        ["dedupe_key"],
+        postgresql_where=PENDING,
+        sqlite_where=PENDING,
+        unique=True,
+    )
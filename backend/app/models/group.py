@@ -0,0 +1,22 @@
+from sqlalchemy import ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class Group(Base):
+    __tablename__ = "groups"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255))
+
+
+class GroupMembership(Base):
+    __tablename__ = "group_memberships"
+    # The (group_id, user_id) primary key serves authorization lookups; the
+    # user_id index serves "which groups am I in".
+    __table_args__ = (Index("ix_group_memberships_user_id", "user_id"),)
+
+    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    role: Mapped[str] = mapped_column(String(20), default="member")
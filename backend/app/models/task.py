@@ -1,16 +1,108 @@
-from sqlalchemy import ForeignKey, String, Text
+from datetime import datetime
+
+from sqlalchemy import DDL, DateTime, ForeignKey, Index, String, Text, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.timeutils import utcnow
 
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_owner_id_id", "owner_id", "id"),
+        Index("ix_tasks_owner_id_completed_id", "owner_id", "completed", "id"),
+        Index("ix_tasks_owner_id_title_id", "owner_id", "title", "id"),
+        Index("ix_tasks_owner_id_change_seq", "owner_id", "change_seq"),
+        Index("ix_tasks_group_id_id", "group_id", "id"),
+        Index(
+            "ix_tasks_done_updated_at",
+            "updated_at",
+            postgresql_where=text("completed"),
+            sqlite_where=text("completed = 1"),
+        ),
+        Index(
+            "ix_tasks_open_owner_id_title_id",
+            "owner_id",
+            "title",
+            "id",
+            postgresql_where=text("NOT completed"),
+            sqlite_where=text("completed = 0"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(255))
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     completed: Mapped[bool] = mapped_column(default=False)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    # Set for tasks shared with a group; owner_id is then the member who
+    # created it, and the task still counts towards their own list.
+    group_id: Mapped[int | None] = mapped_column(ForeignKey("groups.id"), nullable=True)
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    change_seq: Mapped[int] = mapped_column(default=0, server_default="0")
+    # NULL only for rows written before the column existed.
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, default=utcnow, onupdate=utcnow
+    )
 
     owner: Mapped["User"] = relationship(back_populates="tasks")
+
+
+# Row version behind task ETags. Update statements bump it explicitly; this
+# covers changes made through the unit of work.
+@event.listens_for(Task, "before_update")
+def _bump_version(mapper, connection, target: Task) -> None:
+    target.version = (target.version or 0) + 1
+
+
+# Full-text search index. Postgres gets a GIN index on this expression, which
+# queries must repeat verbatim for the planner to use it; SQLite gets an
+# external-content FTS5 table kept in sync by triggers. Queries against either
+# live in app/search.py.
+SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+)
+
+_POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX ix_tasks_search_document ON tasks USING GIN ({SEARCH_DOCUMENT})",
+]
+
+_SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+]
+
+for statement in _POSTGRES_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+for statement in _SQLITE_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+# title_prefix filters on Postgres: a btree under the database's collation
+# can't serve LIKE 'prefix%', a text_pattern_ops one can.
+event.listen(
+    Task.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX ix_tasks_owner_id_title_pattern "
+        "ON tasks (owner_id, title text_pattern_ops)"
+    ).execute_if(dialect="postgresql"),
+)
+
+event.listen(
+    Task.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
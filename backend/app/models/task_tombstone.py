@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.timeutils import utcnow
+
+
+class TaskTombstone(Base):
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_owner_id_change_seq", "owner_id", "change_seq"),
+    )
+
+    # Surrogate key: SQLite may hand a deleted task's id to a new task.
+    id: Mapped[int] = mapped_column(primary_key=True)
+    task_id: Mapped[int]
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    change_seq: Mapped[int]
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, index=True
+    )
@@ -10,7 +10,15 @@ class User(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     hashed_password: Mapped[str] = mapped_column(String(255))
+    task_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    completed_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    # Per-user change sequence behind /tasks/changes sync tokens, and the
+    # highest sequence whose tombstones have been compacted away.
+    change_seq: Mapped[int] = mapped_column(default=0, server_default="0")
+    tombstone_floor: Mapped[int] = mapped_column(default=0, server_default="0")
 
+    # Never loaded or cascaded through the ORM: accounts can own far too many
+    # tasks for that. app.accounts deletes them in chunks instead.
     tasks: Mapped[list["Task"]] = relationship(
-        back_populates="owner", cascade="all, delete-orphan"
+        back_populates="owner", passive_deletes="all", lazy="raise"
     )
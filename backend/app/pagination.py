@@ -0,0 +1,17 @@
+import base64
+import binascii
+
+
+def encode_cursor(owner_id: int, last_id: int) -> str:
+    raw = f"{owner_id}:{last_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        owner_id, last_id = raw.split(":")
+        return int(owner_id), int(last_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
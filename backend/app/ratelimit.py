@@ -0,0 +1,110 @@
+import ipaddress
+import math
+import time
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+from fastapi import HTTPException, Request, status
+
+from app.config import settings
+
+
+class RateLimitBackend:
+    # Shared backends (e.g. Redis) implement the same call so several workers
+    # can enforce one budget. Returns 0 when allowed, otherwise the number of
+    # seconds until the next token is available.
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> float:
+        raise NotImplementedError
+
+
+class InMemoryBackend(RateLimitBackend):
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - updated) * refill_per_second)
+
+        if tokens >= 1:
+            retry_after = 0.0
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+
+        return retry_after
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.rejected: Counter[str] = Counter()
+
+    async def check(self, scope: str, key: str, limit: int, window: float) -> None:
+        if not settings.rate_limit_enabled:
+            return
+
+        retry_after = await self.backend.acquire(f"{scope}:{key}", limit, limit / window)
+        if retry_after:
+            self.rejected[scope] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+rate_limiter = RateLimiter(InMemoryBackend())
+
+
+Network = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxies: tuple[str, ...]) -> tuple[Network, ...]:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    networks = _trusted_networks(tuple(settings.trusted_proxies))
+    return any(address in network for network in networks)
+
+
+def client_ip(request: Request) -> str:
+    host = request.client.host if request.client else "unknown"
+    if not _is_trusted(host):
+        return host
+
+    # Behind a trusted proxy the peer is the proxy itself. Walk X-Forwarded-For
+    # from the right, past hops we trust, to the address the first of them saw;
+    # anything further left is client-supplied and can be forged.
+    forwarded = request.headers.get("x-forwarded-for", "")
+    for hop in reversed([part.strip() for part in forwarded.split(",") if part.strip()]):
+        if not _is_trusted(hop):
+            return hop
+        host = hop
+    return host
+
+
+async def limit_auth_attempt(request: Request, action: str, email: str | None = None) -> None:
+    window = settings.auth_rate_limit_window_seconds
+    await rate_limiter.check(
+        f"{action}:ip", client_ip(request), settings.auth_ip_rate_limit, window
+    )
+    if email is not None:
+        await rate_limiter.check(
+            f"{action}:email", email.lower(), settings.auth_email_rate_limit, window
+        )
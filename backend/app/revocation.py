@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+# The denylist table is the source of truth; each worker keeps the live jtis
+# in memory so get_current_user can check revocation without a DB hit.
+class RevocationStore:
+    def __init__(self):
+        self._revoked: dict[str, datetime] = {}
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return jti is not None and jti in self._revoked
+
+    async def revoke(self, db: AsyncSession, jti: str, expires_at: datetime) -> None:
+        if jti in self._revoked:
+            return
+        existing = await db.get(RevokedToken, jti)
+        if existing is None:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+            await db.commit()
+        self._revoked[jti] = expires_at
+
+    async def load(self, db: AsyncSession) -> None:
+        now = datetime.now(timezone.utc)
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+        await db.commit()
+        result = await db.execute(select(RevokedToken.jti, RevokedToken.expires_at))
+        self._revoked = dict(result.all())
+
+    async def refresh_forever(
+        self, session_factory: async_sessionmaker[AsyncSession], interval: float
+    ) -> None:
+        # Picks up revocations made by other workers.
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as session:
+                    await self.load(session)
+            except Exception:
+                logger.exception("Failed to reload revoked tokens")
+
+    def clear(self) -> None:
+        self._revoked.clear()
+
+
+revocation_store = RevocationStore()
@@ -1,25 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.accounts import delete_account, owns_more_than
+from app.config import settings
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import bearer_scheme, get_current_user, user_cache
+from app.jobs import enqueue
 from app.models.user import User
-from app.schemas.auth import LoginRequest, RefreshRequest, TokenResponse
+from app.ratelimit import limit_auth_attempt
+from app.revocation import revocation_store
+from app.schemas.auth import LoginRequest, LogoutRequest, RefreshRequest, TokenResponse
+from app.schemas.job import JobResponse
 from app.schemas.user import UserCreate, UserResponse
 from app.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
-    verify_password,
+    needs_rehash,
+    password_hasher,
 )
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
+async def register(
+    user_data: UserCreate, request: Request, db: AsyncSession = Depends(get_db)
+):
+    await limit_auth_attempt(request, "register", user_data.email)
+
     result = await db.execute(select(User).where(User.email == user_data.email))
     if result.scalar_one_or_none():
         raise HTTPException(
@@ -29,7 +42,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 
     user = User(
         email=user_data.email,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await password_hasher.hash(user_data.password),
     )
     db.add(user)
     await db.commit()
@@ -39,16 +52,27 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
+async def login(
+    login_data: LoginRequest, request: Request, db: AsyncSession = Depends(get_db)
+):
+    await limit_auth_attempt(request, "login", login_data.email)
+
     result = await db.execute(select(User).where(User.email == login_data.email))
     user = result.scalar_one_or_none()
 
-    if user is None or not verify_password(login_data.password, user.hashed_password):
+    if user is None or not await password_hasher.verify(
+        login_data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await password_hasher.hash(login_data.password)
+        await db.commit()
+        user_cache.invalidate(user.id)
+
     return TokenResponse(
         access_token=create_access_token(user.id),
         refresh_token=create_refresh_token(user.id),
@@ -56,10 +80,18 @@ async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh(refresh_data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+async def refresh(
+    refresh_data: RefreshRequest, request: Request, db: AsyncSession = Depends(get_db)
+):
+    await limit_auth_attempt(request, "refresh")
+
     payload = decode_token(refresh_data.refresh_token)
 
-    if payload is None or payload.get("type") != "refresh":
+    if (
+        payload is None
+        or payload.get("type") != "refresh"
+        or revocation_store.is_revoked(payload.get("jti"))
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token",
@@ -81,6 +113,61 @@ async def refresh(refresh_data: RefreshRequest, db: AsyncSession = Depends(get_d
     )
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    logout_data: LogoutRequest | None = None,
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    tokens = [credentials.credentials]
+    if logout_data is not None and logout_data.refresh_token:
+        tokens.append(logout_data.refresh_token)
+
+    for token in tokens:
+        payload = decode_token(token)
+        if payload is None or "jti" not in payload or payload["sub"] != str(current_user.id):
+            continue
+        expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        await revocation_store.revoke(db, payload["jti"], expires_at)
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
+
+
+@router.delete(
+    "/me",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobResponse}},
+)
+async def delete_me(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    user_id = current_user.id
+    if await owns_more_than(db, user_id, settings.delete_chunk_size):
+        # Too big for one request: a job deletes it chunk by chunk and reports
+        # progress in its result.
+        job = await enqueue(
+            db,
+            "delete_account",
+            {"user_id": user_id},
+            owner_id=user_id,
+            dedupe_key=f"delete_account:{user_id}",
+        )
+        return Response(
+            content=JobResponse.model_validate(job).model_dump_json(),
+            status_code=status.HTTP_202_ACCEPTED,
+            media_type="application/json",
+            headers={"Location": f"/api/v1/jobs/{job.id}"},
+        )
+
+    payload = decode_token(credentials.credentials)
+    await delete_account(db, user_id, chunk_size=settings.delete_chunk_size)
+    if payload is not None and "jti" in payload:
+        expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        await revocation_store.revoke(db, payload["jti"], expires_at)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
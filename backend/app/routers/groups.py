@@ -0,0 +1,130 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import get_current_user, get_group_role, membership_cache
+from app.models.group import Group, GroupMembership
+from app.models.user import User
+from app.schemas.group import GroupCreate, GroupMemberAdd, GroupMemberResponse, GroupResponse
+
+router = APIRouter(prefix="/api/v1/groups", tags=["groups"])
+
+
+async def _require_owner(db: AsyncSession, group_id: int, user_id: int) -> None:
+    role = await get_group_role(db, group_id, user_id)
+    if role is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+    if role != "owner":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Only group owners can do this"
+        )
+
+
+@router.post("/", response_model=GroupResponse, status_code=status.HTTP_201_CREATED)
+async def create_group(
+    group_data: GroupCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    group_id = await db.scalar(insert(Group).values(name=group_data.name).returning(Group.id))
+    await db.execute(
+        insert(GroupMembership).values(group_id=group_id, user_id=current_user.id, role="owner")
+    )
+    await db.commit()
+    return GroupResponse(id=group_id, name=group_data.name, role="owner")
+
+
+@router.get("/", response_model=list[GroupResponse])
+async def list_groups(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    result = await db.execute(
+        select(Group.id, Group.name, GroupMembership.role)
+        .join(GroupMembership, GroupMembership.group_id == Group.id)
+        .where(GroupMembership.user_id == current_user.id)
+        .order_by(Group.id)
+    )
+    return [GroupResponse(id=id, name=name, role=role) for id, name, role in result.all()]
+
+
+@router.get("/{group_id}/members", response_model=list[GroupMemberResponse])
+async def list_members(
+    group_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if await get_group_role(db, group_id, current_user.id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+
+    result = await db.scalars(
+        select(GroupMembership)
+        .where(GroupMembership.group_id == group_id)
+        .order_by(GroupMembership.user_id)
+    )
+    return result.all()
+
+
+@router.post(
+    "/{group_id}/members",
+    response_model=GroupMemberResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_member(
+    group_id: int,
+    member_data: GroupMemberAdd,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    await _require_owner(db, group_id, current_user.id)
+
+    user_id = await db.scalar(select(User.id).where(User.email == member_data.email))
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if await get_group_role(db, group_id, user_id) is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Already a member")
+
+    await db.execute(
+        insert(GroupMembership).values(group_id=group_id, user_id=user_id, role=member_data.role)
+    )
+    await db.commit()
+    membership_cache.invalidate((group_id, user_id))
+    return GroupMemberResponse(user_id=user_id, role=member_data.role)
+
+
+@router.delete("/{group_id}/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_member(
+    group_id: int,
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Members may leave on their own; removing anyone else takes an owner.
+    if user_id != current_user.id:
+        await _require_owner(db, group_id, current_user.id)
+
+    result = await db.execute(
+        delete(GroupMembership)
+        .where(GroupMembership.group_id == group_id, GroupMembership.user_id == user_id)
+        .returning(GroupMembership.role)
+    )
+    role = result.scalar_one_or_none()
+    if role is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
+
+    if role == "owner":
+        owners = await db.scalar(
+            select(func.count()).where(
+                GroupMembership.group_id == group_id, GroupMembership.role == "owner"
+            )
+        )
+        if not owners:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A group needs at least one owner",
+            )
+
+    await db.commit()
+    membership_cache.invalidate((group_id, user_id))
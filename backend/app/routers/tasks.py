@@ -1,70 +1,706 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import csv
+import io
+import json
+import sys
+from collections.abc import AsyncIterator
+from typing import Literal
 
-from app.database import get_db
-from app.dependencies import get_current_user
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import (
+    Select,
+    Update,
+    and_,
+    delete,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.archive import restore_task
+from app.changes import record_tombstones, reserve_change_seqs
+from app.config import settings
+from app.database import get_db, get_session_factory
+from app.dependencies import get_current_user, membership_cache
+from app.events import event_broker
+from app.etag import etag_matches, if_match_versions, list_etag, task_etag
+from app.jobs import enqueue, job_handler
+from app.models.group import GroupMembership
 from app.models.task import Task
+from app.models.task_archive import TaskArchive
+from app.models.task_tombstone import TaskTombstone
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskListResponse, TaskResponse, TaskUpdate
+from app.pagination import decode_cursor, encode_cursor
+from app.search import build_search_query, search_terms
+from app.schemas.job import JobResponse
+from app.schemas.task import (
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkResponse,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskChangesResponse,
+    TaskCreate,
+    TaskListResponse,
+    TaskResponse,
+    TaskStatsResponse,
+    TaskUpdate,
+)
 
 router = APIRouter(prefix="/api/v1/tasks", tags=["tasks"])
 
+# Read endpoints select these columns as plain rows and serialize them with
+# orjson, skipping ORM materialization and pydantic validation per item.
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+TASK_COLUMNS = tuple(getattr(Task, field) for field in TASK_FIELDS)
+
+EXPORT_COLUMNS = TASK_FIELDS
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _task_event(event_type: str, task: Task) -> dict:
+    return {
+        "type": event_type,
+        "task": {field: getattr(task, field) for field in TASK_FIELDS},
+    }
+
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    task = Task(
-        title=task_data.title,
-        description=task_data.description,
-        owner_id=current_user.id,
+    change_seq = await reserve_change_seqs(db, current_user.id, tasks=1)
+    result = await db.scalars(
+        insert(Task)
+        .values(
+            title=task_data.title,
+            description=task_data.description,
+            owner_id=current_user.id,
+            change_seq=change_seq,
+        )
+        .returning(Task)
     )
-    db.add(task)
+    task = result.one()
     await db.commit()
-    await db.refresh(task)
+    await event_broker.publish(current_user.id, _task_event("created", task))
+    response.headers["ETag"] = task_etag(task.id, task.version)
     return task
 
 
+def build_list_query(
+    owner_id: int,
+    completed: bool | None = None,
+    sort: str = "id",
+    title_prefix: str | None = None,
+    dialect_name: str = "sqlite",
+) -> Select:
+    query = select(*TASK_COLUMNS, Task.version).where(Task.owner_id == owner_id)
+
+    # completed is compared against a literal rather than a bound parameter so
+    # that SQLite can match the partial index on open tasks.
+    if completed is not None:
+        query = query.where(Task.completed == (true() if completed else false()))
+
+    # Postgres runs a plain LIKE 'prefix%' against the text_pattern_ops index,
+    # which compares bytes whatever the database collation is. SQLite's LIKE
+    # is case-insensitive and can't use that index, but its BINARY collation
+    # is byte order, so there the prefix becomes a range on (owner_id, title,
+    # id) and the LIKE only trims the open-ended case below.
+    if title_prefix:
+        query = query.where(Task.title.startswith(title_prefix, autoescape=True))
+        if dialect_name != "postgresql":
+            query = query.where(Task.title >= title_prefix)
+            if ord(title_prefix[-1]) < sys.maxunicode:
+                upper_bound = title_prefix[:-1] + chr(ord(title_prefix[-1]) + 1)
+                query = query.where(Task.title < upper_bound)
+
+    descending = sort.startswith("-")
+    order = [Task.title, Task.id] if sort.lstrip("-") == "title" else [Task.id]
+    return query.order_by(*(column.desc() if descending else column for column in order))
+
+
 @router.get("/", response_model=TaskListResponse)
 async def list_tasks(
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    include_total: bool | None = Query(default=None),
+    completed: bool | None = Query(default=None),
+    sort: Literal["id", "-id", "title", "-title"] = Query(default="id"),
+    title_prefix: str | None = Query(default=None, max_length=255),
+    if_none_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    total_result = await db.execute(
-        select(func.count()).select_from(Task).where(Task.owner_id == current_user.id)
+    dialect_name = db.get_bind().dialect.name
+    query = build_list_query(current_user.id, completed, sort, title_prefix, dialect_name)
+    keyset = sort in ("id", "-id")
+
+    if cursor is not None:
+        if not keyset:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination requires sort=id or sort=-id",
+            )
+        try:
+            cursor_owner_id, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if cursor_owner_id != current_user.id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(Task.id < last_id if sort == "-id" else Task.id > last_id)
+    else:
+        query = query.offset(skip)
+
+    # Offset paging keeps reporting the total for existing clients; cursor
+    # paging only pays for it when asked.
+    if include_total is None:
+        include_total = cursor is None
+
+    total = None
+    if include_total and title_prefix:
+        count_query = build_list_query(
+            current_user.id, completed, title_prefix=title_prefix, dialect_name=dialect_name
+        )
+        total = await db.scalar(select(func.count()).select_from(count_query.subquery()))
+    elif include_total:
+        counters = await db.execute(
+            select(User.task_count, User.completed_count).where(User.id == current_user.id)
+        )
+        task_count, completed_count = counters.one()
+        if completed is None:
+            total = task_count
+        elif completed:
+            total = completed_count
+        else:
+            total = task_count - completed_count
+
+    result = await db.execute(query.limit(limit))
+    rows = result.all()
+
+    next_cursor = None
+    if keyset and len(rows) == limit:
+        next_cursor = encode_cursor(current_user.id, rows[-1].id)
+
+    skip = skip if cursor is None else 0
+    etag = list_etag(
+        current_user.id,
+        skip,
+        limit,
+        completed,
+        sort,
+        title_prefix,
+        total,
+        next_cursor,
+        [(row.id, row.version) for row in rows],
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return ORJSONResponse(
+        {
+            "items": [dict(zip(TASK_FIELDS, row)) for row in rows],
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        },
+        headers={"ETag": etag},
     )
-    total = total_result.scalar()
 
+
+@router.get("/stats", response_model=TaskStatsResponse)
+async def task_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
     result = await db.execute(
-        select(Task)
-        .where(Task.owner_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
+        select(User.task_count, User.completed_count).where(User.id == current_user.id)
+    )
+    task_count, completed_count = result.one()
+    return TaskStatsResponse(total=task_count, completed=completed_count)
+
+
+@router.post("/bulk", response_model=TaskBulkResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_create_tasks(
+    bulk_data: TaskBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    count = len(bulk_data.items)
+    first_seq = await reserve_change_seqs(db, current_user.id, count, tasks=count)
+    result = await db.scalars(
+        insert(Task).returning(Task, sort_by_parameter_order=True),
+        [
+            {
+                "title": item.title,
+                "description": item.description,
+                "owner_id": current_user.id,
+                "change_seq": first_seq + offset,
+            }
+            for offset, item in enumerate(bulk_data.items)
+        ],
+    )
+    tasks = result.all()
+    await db.commit()
+    await event_broker.publish_many(
+        current_user.id, [_task_event("created", task) for task in tasks]
+    )
+
+    return TaskBulkResponse(
+        results=[
+            TaskBulkResult(id=task.id, status=status.HTTP_201_CREATED, task=task)
+            for task in tasks
+        ]
+    )
+
+
+@router.patch("/bulk", response_model=TaskBulkResponse)
+async def bulk_update_tasks(
+    bulk_data: TaskBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    ids = {item.id for item in bulk_data.items}
+    # The counter delta below is computed from these completed values, so the
+    # rows are locked until commit (in id order, so concurrent bulk updates
+    # can't deadlock); a concurrent PATCH flipping one would otherwise be
+    # counted twice. SQLite already serializes writers.
+    owned_result = await db.execute(
+        select(Task.id, Task.completed)
+        .where(_owned_by(current_user.id), Task.id.in_(ids))
+        .order_by(Task.id)
+        .with_for_update(of=Task)
+    )
+    completed_before = dict(owned_result.all())
+    owned_ids = set(completed_before)
+
+    mappings = []
+    completed_after = dict(completed_before)
+    for item in bulk_data.items:
+        if item.id in owned_ids:
+            values = item.model_dump(exclude_unset=True)
+            if "completed" in values:
+                completed_after[item.id] = values["completed"]
+            mappings.append(values | {"id": item.id})
+
+    tasks = {}
+    if mappings:
+        first_seq = await reserve_change_seqs(
+            db,
+            current_user.id,
+            len(mappings),
+            completed=sum(completed_after.values()) - sum(completed_before.values()),
+        )
+        for offset, values in enumerate(mappings):
+            values["change_seq"] = first_seq + offset
+        await db.execute(update(Task), mappings)
+        await db.execute(
+            update(Task)
+            .where(Task.id.in_(owned_ids))
+            .values(version=Task.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        updated = await db.scalars(
+            select(Task)
+            .where(Task.id.in_(owned_ids))
+            .execution_options(populate_existing=True)
+        )
+        tasks = {task.id: task for task in updated}
+    await db.commit()
+    await event_broker.publish_many(
+        current_user.id, [_task_event("updated", task) for task in tasks.values()]
+    )
+
+    return TaskBulkResponse(
+        results=[
+            TaskBulkResult(id=item.id, status=status.HTTP_200_OK, task=tasks[item.id])
+            if item.id in tasks
+            else TaskBulkResult(id=item.id, status=status.HTTP_404_NOT_FOUND)
+            for item in bulk_data.items
+        ]
+    )
+
+
+@router.delete("/bulk", response_model=TaskBulkResponse)
+async def bulk_delete_tasks(
+    bulk_data: TaskBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    result = await db.execute(
+        delete(Task)
+        .where(_owned_by(current_user.id), Task.id.in_(set(bulk_data.ids)))
+        .returning(Task.id, Task.completed)
+    )
+    deleted = dict(result.all())
+    deleted_ids = set(deleted)
+    await record_tombstones(db, current_user.id, list(deleted), completed=sum(deleted.values()))
+    await db.commit()
+    await event_broker.publish_many(
+        current_user.id, [{"type": "deleted", "id": task_id} for task_id in deleted]
+    )
+
+    return TaskBulkResponse(
+        results=[
+            TaskBulkResult(
+                id=task_id,
+                status=(
+                    status.HTTP_204_NO_CONTENT
+                    if task_id in deleted_ids
+                    else status.HTTP_404_NOT_FOUND
+                ),
+            )
+            for task_id in bulk_data.ids
+        ]
+    )
+
+
+@router.get("/changes", response_model=TaskChangesResponse)
+async def list_task_changes(
+    since: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    since_seq = 0
+    if since is not None:
+        try:
+            owner_id, since_seq = decode_cursor(since)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
+        if owner_id != current_user.id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
+
+    # Read the head first: anything committed with a higher sequence after this
+    # point is left for the next sync rather than half-read now.
+    result = await db.execute(
+        select(User.change_seq, User.tombstone_floor).where(User.id == current_user.id)
     )
-    items = result.scalars().all()
+    head, floor = result.one()
+    if since is not None and since_seq < floor:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token has expired, refetch the task list",
+        )
+
+    changed = await db.execute(
+        select(Task.change_seq, *TASK_COLUMNS)
+        .where(Task.owner_id == current_user.id, Task.change_seq.between(since_seq + 1, head))
+        .order_by(Task.change_seq)
+        .limit(limit + 1)
+    )
+    changes = [(row[0], dict(zip(TASK_FIELDS, row[1:]))) for row in changed.all()]
+    if since is not None:
+        # A first sync starts from an empty list, so it has nothing to delete.
+        tombstones = await db.execute(
+            select(TaskTombstone.change_seq, TaskTombstone.task_id)
+            .where(
+                TaskTombstone.owner_id == current_user.id,
+                TaskTombstone.change_seq.between(since_seq + 1, head),
+            )
+            .order_by(TaskTombstone.change_seq)
+            .limit(limit + 1)
+        )
+        changes += tombstones.all()
+    changes.sort(key=lambda change: change[0])
+
+    page = changes[:limit]
+    has_more = len(changes) > limit
+    next_seq = page[-1][0] if has_more else head
 
-    return TaskListResponse(items=items, total=total, skip=skip, limit=limit)
+    # A task deleted and re-created within the page (an archive restore, or
+    # SQLite reusing an id) has both a tombstone and a task row; only the
+    # later of the two is sent, so the two lists never disagree.
+    latest: dict[int, dict | int] = {}
+    for _, change in page:
+        task_id = change["id"] if isinstance(change, dict) else change
+        latest.pop(task_id, None)
+        latest[task_id] = change
+
+    return ORJSONResponse(
+        {
+            "tasks": [change for change in latest.values() if isinstance(change, dict)],
+            "deleted": [change for change in latest.values() if isinstance(change, int)],
+            "next_token": encode_cursor(current_user.id, next_seq),
+            "has_more": has_more,
+        }
+    )
+
+
+@router.get("/search", response_model=TaskListResponse)
+async def search_tasks(
+    q: str = Query(min_length=1, max_length=255),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    terms = search_terms(q)
+    if not terms:
+        return TaskListResponse(items=[], total=0, skip=skip, limit=limit)
+
+    query = build_search_query(
+        db.get_bind().dialect.name, current_user.id, terms, columns=TASK_COLUMNS
+    )
+    result = await db.execute(query.offset(skip).limit(limit))
+
+    return ORJSONResponse(
+        {
+            "items": [dict(zip(TASK_FIELDS, row)) for row in result.all()],
+            "total": None,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": None,
+        }
+    )
+
+
+@job_handler("delete_completed_tasks")
+async def _delete_completed_tasks(db: AsyncSession, payload: dict) -> dict:
+    owner_id = payload["owner_id"]
+    deleted = 0
+    while True:
+        chunk = (
+            select(Task.id)
+            .where(Task.owner_id == owner_id, Task.completed.is_(True))
+            .limit(settings.delete_chunk_size)
+        )
+        result = await db.scalars(
+            delete(Task).where(Task.id.in_(chunk)).returning(Task.id)
+        )
+        task_ids = result.all()
+        count = len(task_ids)
+        if not count:
+            return {"deleted": deleted}
+
+        await record_tombstones(db, owner_id, task_ids, completed=count)
+        await db.commit()
+        await event_broker.publish_many(
+            owner_id, [{"type": "deleted", "id": task_id} for task_id in task_ids]
+        )
+        deleted += count
+
+
+@router.delete(
+    "/completed", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def delete_completed_tasks(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = await enqueue(
+        db, "delete_completed_tasks", {"owner_id": current_user.id}, owner_id=current_user.id
+    )
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return job
+
+
+async def _export_rows(
+    session_factory: async_sessionmaker[AsyncSession],
+    owner_id: int,
+    export_format: str,
+) -> AsyncIterator[str]:
+    query = (
+        select(*(getattr(Task, column) for column in EXPORT_COLUMNS))
+        .where(Task.owner_id == owner_id)
+        .order_by(Task.id)
+        .execution_options(yield_per=settings.export_chunk_size)
+    )
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+
+    async with session_factory() as session:
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            if export_format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows
+                )
+
+
+@router.get("/export")
+async def export_tasks(
+    export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    current_user: User = Depends(get_current_user),
+):
+    return StreamingResponse(
+        _export_rows(session_factory, current_user.id, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'},
+    )
+
+
+async def _event_stream(user_id: int) -> AsyncIterator[str]:
+    subscription = event_broker.subscribe(user_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), settings.event_keepalive_seconds
+                )
+            except asyncio.TimeoutError:
+                # Comment lines keep idle proxies from closing the connection.
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def stream_task_events(current_user: User = Depends(get_current_user)):
+    return StreamingResponse(
+        _event_stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/archive", response_model=TaskListResponse)
+async def list_archived_tasks(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    query = select(*(getattr(TaskArchive, field) for field in TASK_FIELDS)).where(
+        TaskArchive.owner_id == current_user.id
+    )
+    if cursor is not None:
+        try:
+            cursor_owner_id, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if cursor_owner_id != current_user.id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(TaskArchive.id > last_id)
+
+    result = await db.execute(query.order_by(TaskArchive.id).limit(limit))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor(current_user.id, rows[-1].id)
+
+    return ORJSONResponse(
+        {
+            "items": [dict(zip(TASK_FIELDS, row)) for row in rows],
+            "total": None,
+            "skip": 0,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.post("/archive/{task_id}/restore", response_model=TaskResponse)
+async def restore_archived_task(
+    task_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    task = await restore_task(db, current_user.id, task_id)
+
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    await db.commit()
+    await event_broker.publish(current_user.id, _task_event("created", task))
+    response.headers["ETag"] = task_etag(task.id, task.version)
+    return task
+
+
+def _owned_by(user_id: int):
+    # A group task stays reachable through the personal routes only while its
+    # owner is still in the group; removal is enforced by the group routes too.
+    return and_(
+        Task.owner_id == user_id,
+        or_(Task.group_id.is_(None), _is_member(Task.group_id, user_id)),
+    )
+
+
+async def _get_owned_task(db: AsyncSession, task_id: int, owner_id: int) -> Task:
+    result = await db.execute(select(Task).where(Task.id == task_id, _owned_by(owner_id)))
+    task = result.scalar_one_or_none()
+
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    return task
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
+    if_none_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     result = await db.execute(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
+        select(*TASK_COLUMNS, Task.version).where(Task.id == task_id, _owned_by(current_user.id))
     )
-    task = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if task is None:
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
+    etag = task_etag(row.id, row.version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return ORJSONResponse(dict(zip(TASK_FIELDS, row)), headers={"ETag": etag})
+
+
+async def _apply_update(db: AsyncSession, query: Update, update_data: dict) -> Task | None:
+    # RETURNING can't report the old value of completed, so the counter delta
+    # is inferred by only matching rows whose completed state actually flips.
+    # When it doesn't flip we fall back to a plain update of the other fields.
+    # The change is sequenced afterwards, in the same UPDATE of the owner's row
+    # that moves their counters; the owner isn't known before the update for
+    # group tasks.
+    values = update_data | {"version": Task.version + 1}
+    completed_delta = 0
+    task = None
+    if update_data.get("completed") is not None:
+        completed = update_data["completed"]
+        result = await db.scalars(
+            query.where(Task.completed.is_not(completed)).values(**values).returning(Task)
+        )
+        task = result.one_or_none()
+        if task is not None:
+            completed_delta = 1 if completed else -1
+
+    if task is None:
+        result = await db.scalars(query.values(**values).returning(Task))
+        task = result.one_or_none()
+        if task is None:
+            return None
+
+    change_seq = await reserve_change_seqs(db, task.owner_id, completed=completed_delta)
+    await db.execute(update(Task).where(Task.id == task.id).values(change_seq=change_seq))
     return task
 
 
@@ -72,23 +708,39 @@ async def get_task(
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
-    )
-    task = result.scalar_one_or_none()
+    expected_versions = if_match_versions(if_match, task_id)
+    update_data = task_data.model_dump(exclude_unset=True)
+
+    if not update_data:
+        task = await _get_owned_task(db, task_id, current_user.id)
+        if expected_versions is not None and task.version not in expected_versions:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Task has changed"
+            )
+        response.headers["ETag"] = task_etag(task.id, task.version)
+        return task
+
+    query = update(Task).where(Task.id == task_id, _owned_by(current_user.id))
+    if expected_versions is not None:
+        query = query.where(Task.version.in_(expected_versions))
+    task = await _apply_update(db, query, update_data)
 
     if task is None:
+        if expected_versions is not None:
+            await _get_owned_task(db, task_id, current_user.id)
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Task has changed"
+            )
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-    update_data = task_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
-
     await db.commit()
-    await db.refresh(task)
+    await event_broker.publish(current_user.id, _task_event("updated", task))
+    response.headers["ETag"] = task_etag(task.id, task.version)
     return task
 
 
@@ -99,12 +751,189 @@ async def delete_task(
     current_user: User = Depends(get_current_user),
 ):
     result = await db.execute(
-        select(Task).where(Task.id == task_id, Task.owner_id == current_user.id)
+        delete(Task)
+        .where(Task.id == task_id, _owned_by(current_user.id))
+        .returning(Task.completed)
     )
-    task = result.scalar_one_or_none()
+    completed = result.scalar_one_or_none()
+
+    if completed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    await record_tombstones(db, current_user.id, [task_id], completed=int(completed))
+    await db.commit()
+    await event_broker.publish(current_user.id, {"type": "deleted", "id": task_id})
+
+
+def _is_member(group_id, user_id: int, role: str | None = None):
+    membership = select(GroupMembership.user_id).where(
+        GroupMembership.group_id == group_id, GroupMembership.user_id == user_id
+    )
+    if role is not None:
+        membership = membership.where(GroupMembership.role == role)
+    return membership.exists()
+
+
+def build_group_list_query(
+    group_id: int, last_id: int, limit: int, member_id: int | None = None
+) -> Select:
+    if member_id is None:
+        return (
+            select(*TASK_COLUMNS)
+            .where(Task.group_id == group_id, Task.id > last_id)
+            .order_by(Task.id)
+            .limit(limit)
+        )
+
+    # The membership row drives the query: no row means not a member, and a
+    # member with an empty page gets one row of NULL task columns.
+    return (
+        select(GroupMembership.role, *TASK_COLUMNS)
+        .outerjoin(Task, and_(Task.group_id == GroupMembership.group_id, Task.id > last_id))
+        .where(GroupMembership.group_id == group_id, GroupMembership.user_id == member_id)
+        .order_by(Task.id)
+        .limit(limit)
+    )
+
+
+# Group task endpoints fold the membership check into the statement that reads
+# or writes the tasks, so authorization never costs a separate round trip.
+@router.get("/groups/{group_id}", response_model=TaskListResponse)
+async def list_group_tasks(
+    group_id: int,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    last_id = 0
+    if cursor is not None:
+        try:
+            cursor_group_id, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if cursor_group_id != group_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if membership_cache.get((group_id, current_user.id)) is not None:
+        result = await db.execute(build_group_list_query(group_id, last_id, limit))
+        rows = result.all()
+    else:
+        result = await db.execute(
+            build_group_list_query(group_id, last_id, limit, member_id=current_user.id)
+        )
+        joined = result.all()
+        if not joined:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+        membership_cache.set((group_id, current_user.id), joined[0].role)
+        rows = [row[1:] for row in joined if row.id is not None]
+
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor(group_id, rows[-1][0])
+
+    return ORJSONResponse(
+        {
+            "items": [dict(zip(TASK_FIELDS, row)) for row in rows],
+            "total": None,
+            "skip": 0,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.post(
+    "/groups/{group_id}", response_model=TaskResponse, status_code=status.HTTP_201_CREATED
+)
+async def create_group_task(
+    group_id: int,
+    task_data: TaskCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    change_seq = await reserve_change_seqs(db, current_user.id, tasks=1)
+    result = await db.scalars(
+        insert(Task)
+        .from_select(
+            ["title", "description", "owner_id", "group_id", "change_seq"],
+            select(
+                literal(task_data.title, Task.title.type),
+                literal(task_data.description, Task.description.type),
+                literal(current_user.id),
+                GroupMembership.group_id,
+                literal(change_seq),
+            ).where(
+                GroupMembership.group_id == group_id,
+                GroupMembership.user_id == current_user.id,
+            ),
+        )
+        .returning(Task)
+    )
+    task = result.one_or_none()
+
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+
+    await db.commit()
+    await event_broker.publish(current_user.id, _task_event("created", task))
+    response.headers["ETag"] = task_etag(task.id, task.version)
+    return task
+
+
+@router.patch("/groups/{group_id}/{task_id}", response_model=TaskResponse)
+async def update_group_task(
+    group_id: int,
+    task_id: int,
+    task_data: TaskUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    update_data = task_data.model_dump(exclude_unset=True)
+    # Same rule as deleting: a member's own tasks, or any task for group owners.
+    query = update(Task).where(
+        Task.id == task_id,
+        Task.group_id == group_id,
+        _is_member(group_id, current_user.id),
+        or_(Task.owner_id == current_user.id, _is_member(group_id, current_user.id, "owner")),
+    )
+    task = await _apply_update(db, query, update_data)
 
     if task is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-    await db.delete(task)
     await db.commit()
+    await event_broker.publish(task.owner_id, _task_event("updated", task))
+    response.headers["ETag"] = task_etag(task.id, task.version)
+    return task
+
+
+@router.delete("/groups/{group_id}/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_group_task(
+    group_id: int,
+    task_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Any member may delete their own group tasks; group owners may delete any.
+    result = await db.execute(
+        delete(Task)
+        .where(
+            Task.id == task_id,
+            Task.group_id == group_id,
+            _is_member(group_id, current_user.id),
+            or_(Task.owner_id == current_user.id, _is_member(group_id, current_user.id, "owner")),
+        )
+        .returning(Task.owner_id, Task.completed)
+    )
+    deleted = result.one_or_none()
+
+    if deleted is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    owner_id, completed = deleted
+    await record_tombstones(db, owner_id, [task_id], completed=int(completed))
+    await db.commit()
+    await event_broker.publish(owner_id, {"type": "deleted", "id": task_id})
@@ -0,0 +1,25 @@
+from typing import Literal
+
+from pydantic import BaseModel, EmailStr
+
+
+class GroupCreate(BaseModel):
+    name: str
+
+
+class GroupResponse(BaseModel):
+    id: int
+    name: str
+    role: str
+
+
+class GroupMemberAdd(BaseModel):
+    email: EmailStr
+    role: Literal["owner", "member"] = "member"
+
+
+class GroupMemberResponse(BaseModel):
+    user_id: int
+    role: str
+
+    model_config = {"from_attributes": True}
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.config import settings
 
 
 class TaskCreate(BaseModel):
@@ -18,12 +20,52 @@ class TaskResponse(BaseModel):
     description: str | None
     completed: bool
     owner_id: int
+    group_id: int | None = None
 
     model_config = {"from_attributes": True}
 
 
 class TaskListResponse(BaseModel):
     items: list[TaskResponse]
-    total: int
+    total: int | None
     skip: int
     limit: int
+    next_cursor: str | None = None
+
+
+class TaskChangesResponse(BaseModel):
+    tasks: list[TaskResponse]
+    deleted: list[int]
+    next_token: str
+    has_more: bool
+
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    completed: int
+
+
+class TaskBulkCreate(BaseModel):
+    items: list[TaskCreate] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskBulkUpdate(BaseModel):
+    items: list[TaskBulkUpdateItem] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+
+class TaskBulkDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+
+class TaskBulkResult(BaseModel):
+    id: int
+    status: int
+    task: TaskResponse | None = None
+
+
+class TaskBulkResponse(BaseModel):
+    results: list[TaskBulkResult]
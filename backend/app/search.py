@@ -0,0 +1,39 @@
+import re
+
+from sqlalchemy import Select, column, func, literal_column, select, table
+
+from app.models.task import SEARCH_DOCUMENT, Task
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+tasks_fts = table("tasks_fts", column("rowid"))
+
+
+def search_terms(q: str) -> list[str]:
+    return _TOKEN_RE.findall(q.lower())
+
+
+def build_search_query(
+    dialect_name: str, owner_id: int, terms: list[str], columns: tuple = (Task,)
+) -> Select:
+    if dialect_name == "postgresql":
+        vector = literal_column(SEARCH_DOCUMENT)
+        tsquery = func.plainto_tsquery("simple", " ".join(terms))
+        return (
+            select(*columns)
+            .where(Task.owner_id == owner_id, vector.op("@@")(tsquery))
+            .order_by(func.ts_rank(vector, tsquery).desc(), Task.id)
+        )
+
+    if dialect_name == "sqlite":
+        # Quote every term so user input can't inject FTS5 query syntax.
+        match = " ".join('"' + term + '"' for term in terms)
+        fts = literal_column("tasks_fts")
+        return (
+            select(*columns)
+            .join(tasks_fts, tasks_fts.c.rowid == Task.id)
+            .where(Task.owner_id == owner_id, fts.op("MATCH")(match))
+            .order_by(func.bm25(fts), Task.id)
+        )
+
+    raise NotImplementedError(f"Full-text search is not supported on {dialect_name}")
@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import Base, get_db, get_session_factory
+from app.dependencies import user_cache
+from app.instrumentation import instrument_engine
+from app.main import app
+from app.models.task import Task
+from app.models.user import User
+from app.security import create_access_token, hash_password
+
+PASSWORD = "password123"
+READ_SCENARIOS = {
+    "auth_me",
+    "list_first_page",
+    "list_middle_page",
+    "list_last_page",
+    "list_cursor_middle_page",
+    "list_cursor_last_page",
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list[float], elapsed: float) -> dict:
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+async def seed(session_factory: async_sessionmaker[AsyncSession], users: int, tasks: int) -> None:
+    hashed = hash_password(PASSWORD)
+    async with session_factory() as session:
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "email": f"bench{i}@example.com",
+                    "hashed_password": hashed,
+                    "task_count": tasks,
+                }
+                for i in range(users)
+            ],
+        )
+        user_ids = (await session.scalars(select(User.id).order_by(User.id))).all()
+        for user_id in user_ids:
+            for start in range(0, tasks, 5000):
+                await session.execute(
+                    insert(Task),
+                    [
+                        {"title": f"Task {n}", "description": "benchmark", "owner_id": user_id}
+                        for n in range(start, min(start + 5000, tasks))
+                    ],
+                )
+        await session.commit()
+
+
+async def measure(
+    iterations: int, concurrency: int, call: Callable[[int], Awaitable[None]]
+) -> dict:
+    samples: list[float] = []
+    counter = iter(range(iterations))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            await call(i)
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    engine = create_async_engine(args.database_url, echo=False)
+    instrument_engine(engine.sync_engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await seed(session_factory, args.users, args.tasks)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    user_cache.clear()
+    settings.rate_limit_enabled = False
+
+    headers = {"Authorization": f"Bearer {create_access_token(1)}"}
+    n = args.iterations
+    results = {}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def request(method: str, url: str, expected: int, **kwargs):
+            response = await client.request(method, url, **kwargs)
+            if response.status_code != expected:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}")
+            return response
+
+        async def login(i):
+            await request(
+                "POST",
+                "/api/v1/auth/login",
+                200,
+                json={"email": f"bench{i % args.users}@example.com", "password": PASSWORD},
+            )
+
+        async def me(i):
+            await request("GET", "/api/v1/auth/me", 200, headers=headers)
+
+        def list_page(skip: int):
+            async def call(i):
+                await request("GET", f"/api/v1/tasks/?skip={skip}&limit=100", 200, headers=headers)
+
+            return call
+
+        async def cursor_at(skip: int) -> str | None:
+            # Walk the cursor forward to the page the offset scenario reads, so
+            # both report the same depth.
+            cursor = None
+            for _ in range(skip // 100):
+                url = "/api/v1/tasks/?limit=100" + (f"&cursor={cursor}" if cursor else "")
+                response = await request("GET", url, 200, headers=headers)
+                cursor = response.json()["next_cursor"]
+            return cursor
+
+        def cursor_page(cursor: str):
+            async def call(i):
+                await request(
+                    "GET", f"/api/v1/tasks/?limit=100&cursor={cursor}", 200, headers=headers
+                )
+
+            return call
+
+        middle_skip = max(args.tasks // 2 - 100, 0)
+        last_skip = max(args.tasks - 100, 0)
+        middle_cursor = await cursor_at(middle_skip)
+        last_cursor = await cursor_at(last_skip)
+
+        created: list[int] = []
+
+        async def create(i):
+            response = await request(
+                "POST", "/api/v1/tasks/", 201, headers=headers, json={"title": f"New {i}"}
+            )
+            created.append(response.json()["id"])
+
+        async def update_(i):
+            await request(
+                "PATCH",
+                f"/api/v1/tasks/{created[i]}",
+                200,
+                headers=headers,
+                json={"completed": i % 2 == 0},
+            )
+
+        async def delete_(i):
+            await request("DELETE", f"/api/v1/tasks/{created[i]}", 204, headers=headers)
+
+        scenarios = [
+            ("login", min(n, args.login_iterations), login),
+            ("auth_me", n, me),
+            ("list_first_page", n, list_page(0)),
+            ("list_middle_page", n, list_page(middle_skip)),
+            ("list_last_page", n, list_page(last_skip)),
+        ]
+        if middle_cursor is not None:
+            scenarios.append(("list_cursor_middle_page", n, cursor_page(middle_cursor)))
+        if last_cursor is not None:
+            scenarios.append(("list_cursor_last_page", n, cursor_page(last_cursor)))
+        scenarios += [
+            ("create_task", n, create),
+            ("update_task", n, update_),
+            ("delete_task", n, delete_),
+        ]
+
+        for name, iterations, call in scenarios:
+            # SQLite has a single writer, so writes run one at a time.
+            concurrency = args.concurrency if name in READ_SCENARIOS else 1
+            results[name] = await measure(iterations, concurrency, call)
+            print(f"{name:<24} {json.dumps(results[name])}", file=sys.stderr)
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+    return {
+        "config": {
+            "users": args.users,
+            "tasks_per_user": args.tasks,
+            "iterations": n,
+            "concurrency": args.concurrency,
+            "database_url": args.database_url,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        result = current["scenarios"].get(name)
+        if result is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {base['rps']} -> {result['rps']}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks per user")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--login-iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--database-url", help="defaults to a fresh SQLite file in a temporary directory"
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed regression, as a fraction"
+    )
+    args = parser.parse_args(argv)
+
+    if args.database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="simple-todo-bench-"), "bench.db")
+        args.database_url = f"sqlite+aiosqlite:///{path}"
+
+    results = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.main  # noqa: F401 - configures mappers
+from app.database import Base
+from app.models.task import Task
+from app.models.user import User
+from app.routers.tasks import TASK_COLUMNS, TASK_FIELDS
+from app.schemas.task import TaskListResponse
+
+
+async def orm_page(session: AsyncSession, limit: int) -> bytes:
+    result = await session.execute(
+        select(Task).where(Task.owner_id == 1).order_by(Task.id).limit(limit)
+    )
+    items = result.scalars().all()
+    model = TaskListResponse.model_validate(
+        {"items": items, "total": limit, "skip": 0, "limit": limit}, from_attributes=True
+    )
+    return json.dumps(jsonable_encoder(model)).encode()
+
+
+async def column_page(session: AsyncSession, limit: int) -> bytes:
+    result = await session.execute(
+        select(*TASK_COLUMNS, Task.version)
+        .where(Task.owner_id == 1)
+        .order_by(Task.id)
+        .limit(limit)
+    )
+    rows = result.all()
+    return ORJSONResponse(
+        {
+            "items": [dict(zip(TASK_FIELDS, row)) for row in rows],
+            "total": limit,
+            "skip": 0,
+            "limit": limit,
+            "next_cursor": None,
+        }
+    ).body
+
+
+async def main(pages: int, limit: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        await session.execute(
+            insert(User), [{"email": "bench@example.com", "hashed_password": "x"}]
+        )
+        await session.execute(
+            insert(Task),
+            [
+                {"title": f"Task {i}", "description": "benchmark", "owner_id": 1}
+                for i in range(limit)
+            ],
+        )
+        await session.commit()
+
+    for name, page in (("orm+pydantic", orm_page), ("columns+orjson", column_page)):
+        async with session_factory() as session:
+            await page(session, limit)
+            start = time.process_time()
+            for _ in range(pages):
+                await page(session, limit)
+                session.expunge_all()
+            cpu = (time.process_time() - start) / pages
+        print(f"{name:<16} {cpu * 1000:.3f} ms CPU per {limit}-item page")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.limit))
@@ -2,15 +2,20 @@ import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_session_factory
+from app.dependencies import membership_cache, user_cache
+from app.instrumentation import instrument_engine
 from app.main import app
 from app.models.user import User
 from app.models.task import Task  # noqa: F401 - needed for metadata
-from app.security import hash_password, create_access_token
+from app.ratelimit import rate_limiter
+from app.revocation import revocation_store
+from app.security import hash_password, create_access_token, token_cache
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+instrument_engine(engine.sync_engine)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -32,6 +37,13 @@ async def client(db: AsyncSession):
         yield db
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: async_session
+    user_cache.clear()
+    membership_cache.clear()
+    token_cache.clear()
+    revocation_store.clear()
+    rate_limiter.backend.clear()
+    rate_limiter.rejected.clear()
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.archive import archive_completed_tasks
+from app.config import settings
+from app.jobs import JobWorker
+from app.models.group import Group, GroupMembership
+from app.models.job import Job
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+from app.models.task_tombstone import TaskTombstone
+from app.models.user import User
+from app.timeutils import utcnow
+from tests.conftest import async_session
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _count(db: AsyncSession, model, user_id: int) -> int:
+    return await db.scalar(select(func.count()).where(model.owner_id == user_id))
+
+
+async def test_delete_me_removes_everything(
+    client: AsyncClient, auth_headers, other_auth_headers, test_user, db: AsyncSession
+):
+    ids = []
+    for title in ("keep", "gone", "old"):
+        response = await client.post("/api/v1/tasks/", json={"title": title}, headers=auth_headers)
+        ids.append(response.json()["id"])
+    await client.delete(f"/api/v1/tasks/{ids[1]}", headers=auth_headers)
+    await client.patch(f"/api/v1/tasks/{ids[2]}", json={"completed": True}, headers=auth_headers)
+    await db.execute(
+        update(Task).where(Task.id == ids[2]).values(updated_at=utcnow() - timedelta(days=40))
+    )
+    await db.commit()
+    await archive_completed_tasks(db, timedelta(days=30))
+    await client.post("/api/v1/tasks/", json={"title": "other"}, headers=other_auth_headers)
+
+    response = await client.delete("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 204
+
+    for model in (Task, TaskArchive, TaskTombstone):
+        assert await _count(db, model, test_user.id) == 0
+    assert await db.scalar(select(User.id).where(User.id == test_user.id)) is None
+
+    response = await client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 401
+    response = await client.get("/api/v1/tasks/", headers=other_auth_headers)
+    assert [t["title"] for t in response.json()["items"]] == ["other"]
+
+
+async def test_large_account_is_deleted_by_a_job(
+    client: AsyncClient, auth_headers, test_user, db: AsyncSession, monkeypatch
+):
+    monkeypatch.setattr(settings, "delete_chunk_size", 2)
+    await db.execute(
+        insert(Task), [{"title": f"T{i}", "owner_id": test_user.id} for i in range(5)]
+    )
+    await db.execute(update(User).where(User.id == test_user.id).values(task_count=5))
+    await db.commit()
+
+    response = await client.delete("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["Location"] == f"/api/v1/jobs/{job_id}"
+
+    response = await client.delete("/api/v1/auth/me", headers=auth_headers)
+    assert response.json()["id"] == job_id
+
+    progress = []
+    real_commit = AsyncSession.commit
+
+    async def commit(session):
+        await real_commit(session)
+        async with async_session() as other:
+            progress.append(await other.scalar(select(Job.result).where(Job.id == job_id)))
+
+    monkeypatch.setattr(AsyncSession, "commit", commit)
+    worker = JobWorker(async_session, concurrency=1, poll_interval=0)
+    assert await worker.run_once()
+    monkeypatch.undo()
+
+    assert {"deleted_tasks": 2, "total_tasks": 5} in progress
+    job = await db.get(Job, job_id)
+    assert job.status == "succeeded"
+    assert job.result == {"deleted_tasks": 5, "total_tasks": 5}
+    assert job.owner_id is None
+    assert await _count(db, Task, test_user.id) == 0
+    assert await db.scalar(select(User.id).where(User.id == test_user.id)) is None
+
+
+async def test_group_ownership_is_handed_over(
+    client: AsyncClient, auth_headers, other_auth_headers, other_user, db: AsyncSession
+):
+    response = await client.post("/api/v1/groups/", json={"name": "Team"}, headers=auth_headers)
+    group_id = response.json()["id"]
+    await client.post(
+        f"/api/v1/groups/{group_id}/members",
+        json={"email": other_user.email},
+        headers=auth_headers,
+    )
+    response = await client.post("/api/v1/groups/", json={"name": "Solo"}, headers=auth_headers)
+    solo_id = response.json()["id"]
+
+    response = await client.delete("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 204
+
+    response = await client.get("/api/v1/groups/", headers=other_auth_headers)
+    assert response.json() == [{"id": group_id, "name": "Team", "role": "owner"}]
+    assert await db.get(Group, solo_id) is None
+    members = await db.scalars(
+        select(GroupMembership.user_id).where(GroupMembership.group_id == group_id)
+    )
+    assert members.all() == [other_user.id]
@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.archive import archive_completed_tasks
+from app.jobs import JobWorker, enqueue
+from app.models.task import Task
+from app.timeutils import utcnow
+from tests.conftest import async_session
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _seed(client: AsyncClient, headers: dict, db: AsyncSession) -> dict[str, int]:
+    ids = {}
+    for title, completed in (("old done", True), ("old open", False), ("new done", True)):
+        response = await client.post("/api/v1/tasks/", json={"title": title}, headers=headers)
+        ids[title] = response.json()["id"]
+        if completed:
+            await client.patch(
+                f"/api/v1/tasks/{ids[title]}", json={"completed": True}, headers=headers
+            )
+
+    await db.execute(
+        update(Task)
+        .where(Task.id.in_([ids["old done"], ids["old open"]]))
+        .values(updated_at=utcnow() - timedelta(days=40))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return ids
+
+
+async def test_archives_only_old_completed_tasks(
+    client: AsyncClient, auth_headers, db: AsyncSession
+):
+    ids = await _seed(client, auth_headers, db)
+
+    assert await archive_completed_tasks(db, timedelta(days=30), chunk_size=1) == 1
+
+    response = await client.get("/api/v1/tasks/", headers=auth_headers)
+    assert [t["title"] for t in response.json()["items"]] == ["old open", "new done"]
+    assert response.json()["total"] == 2
+
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 2, "completed": 1}
+
+    response = await client.get("/api/v1/tasks/archive", headers=auth_headers)
+    items = response.json()["items"]
+    assert [(t["id"], t["title"]) for t in items] == [(ids["old done"], "old done")]
+
+
+async def test_rows_without_updated_at_are_archived(
+    client: AsyncClient, auth_headers, test_user, db: AsyncSession
+):
+    db.add(Task(title="legacy", completed=True, owner_id=test_user.id))
+    await db.commit()
+    await db.execute(update(Task).values(updated_at=None))
+    await db.commit()
+
+    assert await archive_completed_tasks(db, timedelta(days=30)) == 1
+
+
+async def test_updates_refresh_updated_at(client: AsyncClient, auth_headers, db: AsyncSession):
+    ids = await _seed(client, auth_headers, db)
+
+    await client.patch(
+        f"/api/v1/tasks/{ids['old done']}", json={"title": "touched"}, headers=auth_headers
+    )
+
+    assert await archive_completed_tasks(db, timedelta(days=30)) == 0
+
+
+async def test_restore_moves_task_back(client: AsyncClient, auth_headers, db: AsyncSession):
+    ids = await _seed(client, auth_headers, db)
+    await archive_completed_tasks(db, timedelta(days=30))
+
+    response = await client.post(
+        f"/api/v1/tasks/archive/{ids['old done']}/restore", headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == ids["old done"]
+    assert response.json()["completed"] is True
+
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 3, "completed": 2}
+    response = await client.get("/api/v1/tasks/archive", headers=auth_headers)
+    assert response.json()["items"] == []
+
+    response = await client.post(
+        f"/api/v1/tasks/archive/{ids['old done']}/restore", headers=auth_headers
+    )
+    assert response.status_code == 404
+
+
+async def test_restore_is_owner_only(
+    client: AsyncClient, auth_headers, other_auth_headers, db: AsyncSession
+):
+    ids = await _seed(client, auth_headers, db)
+    await archive_completed_tasks(db, timedelta(days=30))
+
+    response = await client.post(
+        f"/api/v1/tasks/archive/{ids['old done']}/restore", headers=other_auth_headers
+    )
+    assert response.status_code == 404
+    response = await client.get("/api/v1/tasks/archive", headers=other_auth_headers)
+    assert response.json()["items"] == []
+
+
+async def test_archival_runs_as_job(client: AsyncClient, auth_headers, db: AsyncSession):
+    await _seed(client, auth_headers, db)
+    job = await enqueue(db, "archive_completed_tasks", {"older_than_days": 30})
+
+    worker = JobWorker(async_session, concurrency=1, poll_interval=0)
+    assert await worker.run_once()
+
+    await db.refresh(job)
+    assert job.status == "succeeded"
+    assert job.result == {"archived": 1}
+
+
+async def test_archive_candidates_use_partial_index(db: AsyncSession):
+    result = await db.execute(
+        text(
+            "EXPLAIN QUERY PLAN SELECT id FROM tasks "
+            "WHERE completed = 1 AND updated_at < '2020-01-01' LIMIT 1000"
+        )
+    )
+    plan = " ".join(row[-1] for row in result.all())
+    assert "ix_tasks_done_updated_at" in plan
@@ -1,6 +1,11 @@
 import pytest
 from httpx import AsyncClient
 
+from app.config import settings
+from app.dependencies import user_cache
+from app.revocation import revocation_store
+from app.security import PasswordHasherBusy, create_access_token, password_hasher
+
 pytestmark = pytest.mark.asyncio
 
 
@@ -128,3 +133,147 @@ async def test_me_invalid_token(client: AsyncClient):
         headers={"Authorization": "Bearer invalid-token"},
     )
     assert response.status_code == 401
+
+
+async def test_login_rehashes_on_cost_change(client: AsyncClient, test_user, db, monkeypatch):
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+
+    await db.refresh(test_user)
+    assert test_user.hashed_password.startswith("$2b$04$")
+
+
+async def test_login_hasher_busy(client: AsyncClient, test_user, monkeypatch):
+    async def busy(*args):
+        raise PasswordHasherBusy("Password hashing queue is full")
+
+    monkeypatch.setattr(password_hasher, "verify", busy)
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "password123"},
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+async def test_me_uses_user_cache(client: AsyncClient, test_user, auth_headers):
+    await client.get("/api/v1/auth/me", headers=auth_headers)
+    response = await client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "test@example.com"
+    assert user_cache.stats()["hits"] == 1
+    assert user_cache.stats()["misses"] == 1
+
+
+async def test_logout_revokes_tokens(client: AsyncClient, test_user, db):
+    login_response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "password123"},
+    )
+    tokens = login_response.json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = await client.post(
+        "/api/v1/auth/logout",
+        headers=headers,
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == 204
+
+    response = await client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+
+    response = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+    # A fresh worker rebuilds the denylist from the table.
+    revocation_store.clear()
+    await revocation_store.load(db)
+    response = await client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 401
+
+
+async def test_logout_leaves_other_sessions(client: AsyncClient, test_user, auth_headers):
+    other_session = {"Authorization": f"Bearer {create_access_token(test_user.id)}"}
+
+    response = await client.post("/api/v1/auth/logout", headers=auth_headers)
+    assert response.status_code == 204
+
+    response = await client.get("/api/v1/auth/me", headers=other_session)
+    assert response.status_code == 200
+
+
+async def test_login_rate_limited_by_email(client: AsyncClient, test_user, monkeypatch):
+    monkeypatch.setattr(settings, "auth_email_rate_limit", 2)
+
+    async def verify(*args):
+        return False
+
+    monkeypatch.setattr(password_hasher, "verify", verify)
+    for _ in range(2):
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "wrongpassword"},
+        )
+        assert response.status_code == 401
+
+    async def unreachable(*args):
+        raise AssertionError("hashed a rate-limited request")
+
+    monkeypatch.setattr(password_hasher, "verify", unreachable)
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "TEST@example.com", "password": "wrongpassword"},
+    )
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+    response = await client.get("/metrics")
+    assert 'rate_limit_rejected_total{scope="login:email"} 1' in response.text
+
+
+async def test_register_rate_limited_by_ip(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "auth_ip_rate_limit", 1)
+
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": "first@example.com", "password": "secret123"},
+    )
+    assert response.status_code == 201
+
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": "second@example.com", "password": "secret123"},
+    )
+    assert response.status_code == 429
+
+
+async def test_ip_rate_limit_keys_on_forwarded_client(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "auth_ip_rate_limit", 1)
+
+    async def register(email: str, forwarded_for: str):
+        response = await client.post(
+            "/api/v1/auth/register",
+            json={"email": email, "password": "secret123"},
+            headers={"X-Forwarded-For": forwarded_for},
+        )
+        return response.status_code
+
+    # Without a trusted proxy the header is ignored: everything is the peer.
+    assert await register("a@example.com", "203.0.113.1") == 201
+    assert await register("b@example.com", "203.0.113.2") == 429
+
+    monkeypatch.setattr(settings, "trusted_proxies", ["127.0.0.0/8"])
+    assert await register("c@example.com", "203.0.113.3") == 201
+    assert await register("d@example.com", "203.0.113.4") == 201
+    # A forged leftmost entry doesn't buy a fresh bucket.
+    assert await register("e@example.com", "198.51.100.9, 203.0.113.3") == 429
@@ -0,0 +1,18 @@
+from benchmarks.run import compare, percentile
+
+
+def test_percentile():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_compare_flags_regressions():
+    baseline = {"scenarios": {"list": {"p95_ms": 10.0, "rps": 100.0}}}
+    within = {"scenarios": {"list": {"p95_ms": 11.0, "rps": 90.0}}}
+    slower = {"scenarios": {"list": {"p95_ms": 13.0, "rps": 70.0}}}
+
+    assert compare(baseline, within, threshold=0.2) == []
+    assert len(compare(baseline, slower, threshold=0.2)) == 2
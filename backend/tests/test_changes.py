@@ -0,0 +1,192 @@
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.archive import archive_completed_tasks
+from app.changes import compact_tombstones
+from app.models.task import Task
+from app.models.task_tombstone import TaskTombstone
+from app.timeutils import utcnow
+from tests.conftest import engine
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _sync(client: AsyncClient, headers: dict, since: str | None = None, **params):
+    if since is not None:
+        params["since"] = since
+    response = await client.get("/api/v1/tasks/changes", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_initial_sync_returns_all_tasks(client: AsyncClient, auth_headers):
+    for title in ("A", "B"):
+        await client.post("/api/v1/tasks/", json={"title": title}, headers=auth_headers)
+
+    data = await _sync(client, auth_headers)
+
+    assert [task["title"] for task in data["tasks"]] == ["A", "B"]
+    assert data["deleted"] == []
+    assert data["has_more"] is False
+
+
+async def test_sync_returns_only_changes_and_tombstones(client: AsyncClient, auth_headers):
+    ids = []
+    for title in ("Keep", "Edit", "Drop"):
+        response = await client.post(
+            "/api/v1/tasks/", json={"title": title}, headers=auth_headers
+        )
+        ids.append(response.json()["id"])
+    token = (await _sync(client, auth_headers))["next_token"]
+
+    await client.patch(f"/api/v1/tasks/{ids[1]}", json={"title": "Edited"}, headers=auth_headers)
+    await client.post("/api/v1/tasks/", json={"title": "New"}, headers=auth_headers)
+    await client.delete(f"/api/v1/tasks/{ids[2]}", headers=auth_headers)
+
+    data = await _sync(client, auth_headers, token)
+    assert [task["title"] for task in data["tasks"]] == ["Edited", "New"]
+    assert data["deleted"] == [ids[2]]
+
+    data = await _sync(client, auth_headers, data["next_token"])
+    assert data == {
+        "tasks": [],
+        "deleted": [],
+        "next_token": data["next_token"],
+        "has_more": False,
+    }
+
+
+async def test_sync_pages_through_changes(client: AsyncClient, auth_headers):
+    token = (await _sync(client, auth_headers))["next_token"]
+    response = await client.post(
+        "/api/v1/tasks/bulk",
+        json={"items": [{"title": f"Task {i}"} for i in range(5)]},
+        headers=auth_headers,
+    )
+    ids = [result["id"] for result in response.json()["results"]]
+    await client.request(
+        "DELETE", "/api/v1/tasks/bulk", json={"ids": ids[:2]}, headers=auth_headers
+    )
+
+    seen_tasks, seen_deleted = [], []
+    while True:
+        data = await _sync(client, auth_headers, token, limit=2)
+        seen_tasks += [task["id"] for task in data["tasks"]]
+        seen_deleted += data["deleted"]
+        token = data["next_token"]
+        if not data["has_more"]:
+            break
+
+    assert seen_tasks == ids[2:]
+    assert seen_deleted == ids[:2]
+
+
+async def test_restored_task_is_not_reported_deleted(
+    client: AsyncClient, auth_headers, db: AsyncSession
+):
+    response = await client.post("/api/v1/tasks/", json={"title": "Back"}, headers=auth_headers)
+    task_id = response.json()["id"]
+    await client.patch(f"/api/v1/tasks/{task_id}", json={"completed": True}, headers=auth_headers)
+    token = (await _sync(client, auth_headers))["next_token"]
+
+    await db.execute(update(Task).values(updated_at=utcnow() - timedelta(days=40)))
+    await db.commit()
+    await archive_completed_tasks(db, timedelta(days=30))
+    await client.post(f"/api/v1/tasks/archive/{task_id}/restore", headers=auth_headers)
+
+    data = await _sync(client, auth_headers, token)
+    assert [task["id"] for task in data["tasks"]] == [task_id]
+    assert data["deleted"] == []
+
+
+async def test_task_writes_update_the_user_row_once(client: AsyncClient, auth_headers):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE users"):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.post(
+            "/api/v1/tasks/", json={"title": "Once"}, headers=auth_headers
+        )
+        task_id = response.json()["id"]
+        await client.patch(
+            f"/api/v1/tasks/{task_id}", json={"completed": True}, headers=auth_headers
+        )
+        await client.delete(f"/api/v1/tasks/{task_id}", headers=auth_headers)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert len(statements) == 3
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 0, "completed": 0}
+
+
+async def test_unit_of_work_writes_are_sequenced(
+    client: AsyncClient, auth_headers, test_user, db: AsyncSession
+):
+    token = (await _sync(client, auth_headers))["next_token"]
+    task = Task(title="Added", owner_id=test_user.id)
+    db.add(task)
+    await db.commit()
+    task_id = task.id
+    await db.delete(task)
+    await db.commit()
+
+    data = await _sync(client, auth_headers, token)
+    assert data["tasks"] == []
+    assert data["deleted"] == [task_id]
+
+
+async def test_sync_rejects_other_users_token(
+    client: AsyncClient, auth_headers, other_auth_headers
+):
+    token = (await _sync(client, auth_headers))["next_token"]
+
+    response = await client.get(
+        "/api/v1/tasks/changes", params={"since": token}, headers=other_auth_headers
+    )
+    assert response.status_code == 400
+
+
+async def test_compacted_token_expires(
+    client: AsyncClient, auth_headers, db: AsyncSession
+):
+    response = await client.post("/api/v1/tasks/", json={"title": "Old"}, headers=auth_headers)
+    task_id = response.json()["id"]
+    token = (await _sync(client, auth_headers))["next_token"]
+    await client.delete(f"/api/v1/tasks/{task_id}", headers=auth_headers)
+    await db.execute(
+        update(TaskTombstone).values(deleted_at=utcnow() - timedelta(days=31))
+    )
+    await db.commit()
+
+    assert await compact_tombstones(db, timedelta(days=30)) == 1
+    assert (await db.scalars(select(TaskTombstone))).all() == []
+
+    response = await client.get(
+        "/api/v1/tasks/changes", params={"since": token}, headers=auth_headers
+    )
+    assert response.status_code == 410
+
+    token = (await _sync(client, auth_headers))["next_token"]
+    assert (await _sync(client, auth_headers, token))["tasks"] == []
+
+
+async def test_changes_query_uses_sequence_index(db: AsyncSession, test_user):
+    query = (
+        select(Task.id)
+        .where(Task.owner_id == test_user.id, Task.change_seq.between(5, 10))
+        .order_by(Task.change_seq)
+    )
+    compiled = query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    result = await db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    plan = " ".join(row[-1] for row in result.all())
+    assert "ix_tasks_owner_id_change_seq" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import database
+from app.database import Base, InstrumentedQueuePool, SessionRouter, engine_options
+from app.main import app
+from app.models.task import Task
+from app.models.user import User
+from app.security import create_access_token
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_instrumented_pool_records_checkout_wait():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=InstrumentedQueuePool, pool_size=1
+    )
+    other = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=InstrumentedQueuePool, pool_size=1
+    )
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        assert engine.pool.checkedout() == 1
+
+    assert engine.pool.checkout_wait.count == 1
+    assert engine.pool.waiters == 0
+    assert other.pool.checkout_wait.count == 0
+    await engine.dispose()
+    await other.dispose()
+
+
+async def test_engine_options():
+    postgres = engine_options("postgresql+asyncpg://localhost/db")
+    assert postgres["poolclass"] is InstrumentedQueuePool
+    assert "prepared_statement_cache_size" in postgres["connect_args"]
+
+    sqlite = engine_options("sqlite+aiosqlite:///:memory:")
+    assert "poolclass" not in sqlite
+
+
+async def test_pool_stats_endpoint(client: AsyncClient):
+    response = await client.get("/health/db/pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pool"] == "InstrumentedQueuePool"
+    assert {"checked_out", "overflow", "waiters", "checkout_wait_seconds"} <= data.keys()
+
+
+async def test_session_router_sends_reads_to_replicas():
+    primary, replica = object(), object()
+    router = SessionRouter(primary, [replica], sticky_seconds=5.0)
+
+    assert router.factory_for("GET") is replica
+    assert router.factory_for("POST") is primary
+
+    assert router.factory_for("GET", time.time() - 1) is primary
+    assert router.factory_for("GET", time.time() - 10) is replica
+
+    assert SessionRouter(primary).factory_for("GET") is primary
+
+
+@pytest.fixture
+async def replicated(tmp_path, monkeypatch):
+    # Two SQLite files stand in for a primary and a replica that hasn't caught
+    # up: both know the user, only the primary has the task.
+    factories = []
+    for name in ("primary", "replica"):
+        file_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with file_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(file_engine, class_=AsyncSession, expire_on_commit=False)
+        async with factory() as session:
+            session.add(User(id=1, email="test@example.com", hashed_password="x"))
+            await session.commit()
+        factories.append(factory)
+
+    async with factories[0]() as session:
+        session.add(Task(title="On primary", owner_id=1))
+        await session.commit()
+
+    router = SessionRouter(factories[0], [factories[1]], sticky_seconds=5.0)
+    monkeypatch.setattr(database, "session_router", router)
+    app.dependency_overrides.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    for factory in factories:
+        await factory.kw["bind"].dispose()
+
+
+async def test_reads_go_to_replica_until_user_writes(replicated: AsyncClient):
+    headers = {"Authorization": f"Bearer {create_access_token(1)}"}
+
+    response = await replicated.get("/api/v1/tasks/", headers=headers)
+    assert response.json()["items"] == []
+
+    response = await replicated.post("/api/v1/tasks/", json={"title": "New"}, headers=headers)
+    assert response.status_code == 201
+
+    response = await replicated.get("/api/v1/tasks/", headers=headers)
+    assert [t["title"] for t in response.json()["items"]] == ["On primary", "New"]
+
+
+async def test_pin_survives_a_different_worker(replicated: AsyncClient, monkeypatch):
+    headers = {"Authorization": f"Bearer {create_access_token(1)}"}
+
+    response = await replicated.post("/api/v1/tasks/", json={"title": "New"}, headers=headers)
+    assert "last_write" in response.cookies
+
+    # Another worker has its own router and no memory of the write.
+    router = database.session_router
+    monkeypatch.setattr(
+        database, "session_router", SessionRouter(router.primary, router.replicas, 5.0)
+    )
+    response = await replicated.get("/api/v1/tasks/", headers=headers)
+    assert [t["title"] for t in response.json()["items"]] == ["On primary", "New"]
+
+    replicated.cookies.clear()
+    response = await replicated.get("/api/v1/tasks/", headers=headers)
+    assert response.json()["items"] == []
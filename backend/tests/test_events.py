@@ -0,0 +1,226 @@
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.events import (
+    MAX_NOTIFY_PAYLOAD,
+    InMemoryEventBackend,
+    PostgresEventBackend,
+    TaskEventBroker,
+    event_broker,
+    notify_payloads,
+)
+from app.jobs import JobWorker
+from app.models.task import Task
+from app.routers.tasks import _event_stream
+from tests.conftest import async_session
+
+pytestmark = pytest.mark.asyncio
+
+
+def _drain(queue: asyncio.Queue) -> list[dict]:
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+async def test_broker_fans_out_per_user():
+    broker = TaskEventBroker(InMemoryEventBackend(), queue_size=10)
+    first = broker.subscribe(1)
+    second = broker.subscribe(1)
+    other = broker.subscribe(2)
+
+    await broker.publish(1, {"type": "deleted", "id": 5})
+
+    assert _drain(first.queue) == [{"type": "deleted", "id": 5}]
+    assert _drain(second.queue) == [{"type": "deleted", "id": 5}]
+    assert _drain(other.queue) == []
+
+    broker.unsubscribe(first)
+    broker.unsubscribe(second)
+    broker.unsubscribe(other)
+    assert broker.subscriber_count() == 0
+
+
+async def test_slow_subscriber_gets_resync():
+    broker = TaskEventBroker(InMemoryEventBackend(), queue_size=2)
+    subscription = broker.subscribe(1)
+
+    await broker.publish_many(1, [{"type": "deleted", "id": i} for i in range(3)])
+
+    assert _drain(subscription.queue) == [{"type": "resync"}]
+
+
+async def test_publish_many_is_one_backend_call():
+    calls = []
+
+    class RecordingBackend(InMemoryEventBackend):
+        async def publish(self, broker, user_id, events):
+            calls.append(len(events))
+            await super().publish(broker, user_id, events)
+
+    broker = TaskEventBroker(RecordingBackend(), queue_size=1000)
+    await broker.publish_many(1, [{"type": "deleted", "id": i} for i in range(500)])
+    await broker.publish_many(1, [])
+
+    assert calls == [500]
+
+
+async def test_notify_payloads_pack_events_under_the_limit():
+    events = [{"type": "updated", "task": {"id": i, "title": "x" * 300}} for i in range(100)]
+    events.append({"type": "updated", "task": {"id": 999, "title": "y" * 10_000}})
+
+    payloads = notify_payloads(7, events)
+
+    assert len(payloads) < 10
+    assert all(len(payload) <= MAX_NOTIFY_PAYLOAD for payload in payloads)
+    delivered = [event for payload in payloads for event in json.loads(payload)["events"]]
+    assert delivered[:-1] == events[:-1]
+    assert delivered[-1] == {"type": "updated", "id": 999}
+
+
+class FakeListenConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.on_terminate = None
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.on_terminate = callback
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def fetchval(self, query):
+        return 1
+
+    def is_closed(self):
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+
+    def drop(self):
+        self.closed = True
+        self.on_terminate(self)
+
+
+async def test_listener_reconnects_and_resyncs():
+    connections = []
+
+    class FakeBackend(PostgresEventBackend):
+        async def connect(self):
+            if len(connections) == 1:
+                connections.append(None)
+                raise OSError("database is restarting")
+            connection = FakeListenConnection()
+            connections.append(connection)
+            return connection
+
+    backend = FakeBackend(None, ping_interval=0.01, max_reconnect_delay=0.01)
+    broker = TaskEventBroker(backend, queue_size=10)
+    subscription = broker.subscribe(1)
+    await backend.start(broker)
+    try:
+        while not connections:
+            await asyncio.sleep(0)
+        connections[0].drop()
+        while len(connections) < 3 or not connections[2].listeners:
+            await asyncio.sleep(0.01)
+
+        payload = json.dumps({"user_id": 1, "events": [{"type": "deleted", "id": 3}]})
+        next(iter(connections[2].listeners.values()))(None, 0, "task_events", payload)
+        assert _drain(subscription.queue) == [{"type": "resync"}, {"type": "deleted", "id": 3}]
+    finally:
+        await backend.stop()
+    assert connections[2].closed
+
+
+async def test_write_paths_publish_events(client: AsyncClient, auth_headers, test_user):
+    subscription = event_broker.subscribe(test_user.id)
+    try:
+        response = await client.post(
+            "/api/v1/tasks/", json={"title": "Live"}, headers=auth_headers
+        )
+        task_id = response.json()["id"]
+        await client.patch(
+            f"/api/v1/tasks/{task_id}", json={"completed": True}, headers=auth_headers
+        )
+        await client.delete(f"/api/v1/tasks/{task_id}", headers=auth_headers)
+
+        response = await client.post(
+            "/api/v1/tasks/bulk",
+            json={"items": [{"title": "A"}, {"title": "B"}]},
+            headers=auth_headers,
+        )
+        bulk_ids = [result["id"] for result in response.json()["results"]]
+        await client.request(
+            "DELETE", "/api/v1/tasks/bulk", json={"ids": bulk_ids}, headers=auth_headers
+        )
+
+        events = _drain(subscription.queue)
+    finally:
+        event_broker.unsubscribe(subscription)
+
+    assert [event["type"] for event in events] == [
+        "created",
+        "updated",
+        "deleted",
+        "created",
+        "created",
+        "deleted",
+        "deleted",
+    ]
+    assert events[0]["task"]["title"] == "Live"
+    assert events[1]["task"]["completed"] is True
+    assert events[2] == {"type": "deleted", "id": task_id}
+    assert {event["id"] for event in events[5:]} == set(bulk_ids)
+
+
+async def test_other_users_do_not_receive_events(
+    client: AsyncClient, auth_headers, other_user
+):
+    subscription = event_broker.subscribe(other_user.id)
+    try:
+        await client.post("/api/v1/tasks/", json={"title": "Mine"}, headers=auth_headers)
+        assert subscription.queue.empty()
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+async def test_delete_completed_job_publishes_deletes(
+    client: AsyncClient, auth_headers, test_user, db
+):
+    task = Task(title="Done", completed=True, owner_id=test_user.id)
+    db.add(task)
+    await db.commit()
+    await client.delete("/api/v1/tasks/completed", headers=auth_headers)
+
+    subscription = event_broker.subscribe(test_user.id)
+    try:
+        worker = JobWorker(async_session, concurrency=1, poll_interval=0)
+        assert await worker.run_once()
+        assert _drain(subscription.queue) == [{"type": "deleted", "id": task.id}]
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+async def test_event_stream_formats_and_unsubscribes(monkeypatch):
+    monkeypatch.setattr(settings, "event_keepalive_seconds", 0.01)
+    stream = _event_stream(42)
+
+    assert await anext(stream) == "retry: 3000\n\n"
+    assert event_broker.subscriber_count() == 1
+    assert await anext(stream) == ": keepalive\n\n"
+
+    await event_broker.publish(42, {"type": "deleted", "id": 7})
+    assert await anext(stream) == (
+        'event: deleted\ndata: {"type": "deleted", "id": 7}\n\n'
+    )
+
+    await stream.aclose()
+    assert event_broker.subscriber_count() == 0
@@ -0,0 +1,221 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies import membership_cache
+from app.models.task import Task
+from app.models.user import User
+from app.routers.tasks import build_group_list_query
+from app.security import create_access_token
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def group_id(client: AsyncClient, auth_headers, other_user) -> int:
+    response = await client.post("/api/v1/groups/", json={"name": "Team"}, headers=auth_headers)
+    assert response.status_code == 201
+    assert response.json()["role"] == "owner"
+    group_id = response.json()["id"]
+
+    response = await client.post(
+        f"/api/v1/groups/{group_id}/members",
+        json={"email": other_user.email},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    return group_id
+
+
+async def test_members_share_group_tasks(
+    client: AsyncClient, auth_headers, other_auth_headers, group_id, other_user
+):
+    response = await client.post(
+        f"/api/v1/tasks/groups/{group_id}", json={"title": "Shared"}, headers=other_auth_headers
+    )
+    assert response.status_code == 201
+    task = response.json()
+    assert task["group_id"] == group_id
+    assert task["owner_id"] == other_user.id
+
+    response = await client.get(f"/api/v1/tasks/groups/{group_id}", headers=auth_headers)
+    assert [t["title"] for t in response.json()["items"]] == ["Shared"]
+
+    response = await client.patch(
+        f"/api/v1/tasks/groups/{group_id}/{task['id']}",
+        json={"completed": True},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+
+    response = await client.get("/api/v1/tasks/stats", headers=other_auth_headers)
+    assert response.json() == {"total": 1, "completed": 1}
+
+    response = await client.get("/api/v1/groups/", headers=other_auth_headers)
+    assert response.json() == [{"id": group_id, "name": "Team", "role": "member"}]
+
+
+async def test_non_members_get_404(
+    client: AsyncClient, group_id, test_user, db: AsyncSession
+):
+    task = Task(title="Secret", owner_id=test_user.id, group_id=group_id)
+    outsider = User(email="outsider@example.com", hashed_password="x")
+    db.add_all([task, outsider])
+    await db.commit()
+    task_id = task.id
+
+    headers = {"Authorization": f"Bearer {create_access_token(outsider.id)}"}
+    base = f"/api/v1/tasks/groups/{group_id}"
+    assert (await client.get(base, headers=headers)).status_code == 404
+    assert (await client.post(base, json={"title": "x"}, headers=headers)).status_code == 404
+    assert (
+        await client.patch(f"{base}/{task_id}", json={"title": "x"}, headers=headers)
+    ).status_code == 404
+    assert (await client.delete(f"{base}/{task_id}", headers=headers)).status_code == 404
+
+
+async def test_only_creator_or_owner_deletes(
+    client: AsyncClient, auth_headers, other_auth_headers, group_id
+):
+    response = await client.post(
+        f"/api/v1/tasks/groups/{group_id}", json={"title": "Owner's"}, headers=auth_headers
+    )
+    task_id = response.json()["id"]
+
+    response = await client.delete(
+        f"/api/v1/tasks/groups/{group_id}/{task_id}", headers=other_auth_headers
+    )
+    assert response.status_code == 404
+
+    response = await client.delete(
+        f"/api/v1/tasks/groups/{group_id}/{task_id}", headers=auth_headers
+    )
+    assert response.status_code == 204
+
+
+async def test_removing_member_invalidates_cache(
+    client: AsyncClient, auth_headers, other_auth_headers, group_id, other_user
+):
+    response = await client.get(f"/api/v1/tasks/groups/{group_id}", headers=other_auth_headers)
+    assert response.status_code == 200
+    assert membership_cache.get((group_id, other_user.id)) == "member"
+
+    response = await client.delete(
+        f"/api/v1/groups/{group_id}/members/{other_user.id}", headers=auth_headers
+    )
+    assert response.status_code == 204
+    assert membership_cache.get((group_id, other_user.id)) is None
+
+    response = await client.get(f"/api/v1/tasks/groups/{group_id}", headers=other_auth_headers)
+    assert response.status_code == 404
+
+
+async def test_members_cannot_update_others_tasks(
+    client: AsyncClient, auth_headers, other_auth_headers, group_id
+):
+    response = await client.post(
+        f"/api/v1/tasks/groups/{group_id}", json={"title": "Owner's"}, headers=auth_headers
+    )
+    task_id = response.json()["id"]
+
+    response = await client.patch(
+        f"/api/v1/tasks/groups/{group_id}/{task_id}",
+        json={"title": "Hijacked", "completed": True},
+        headers=other_auth_headers,
+    )
+    assert response.status_code == 404
+
+    response = await client.get(f"/api/v1/tasks/groups/{group_id}", headers=auth_headers)
+    assert [(t["title"], t["completed"]) for t in response.json()["items"]] == [
+        ("Owner's", False)
+    ]
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 1, "completed": 0}
+
+
+async def test_removed_members_lose_their_group_tasks(
+    client: AsyncClient, auth_headers, other_auth_headers, group_id, other_user
+):
+    response = await client.post(
+        f"/api/v1/tasks/groups/{group_id}", json={"title": "Mine"}, headers=other_auth_headers
+    )
+    task_id = response.json()["id"]
+    response = await client.delete(
+        f"/api/v1/groups/{group_id}/members/{other_user.id}", headers=auth_headers
+    )
+    assert response.status_code == 204
+
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers=other_auth_headers)
+    assert response.status_code == 404
+    response = await client.patch(
+        f"/api/v1/tasks/{task_id}", json={"title": "Rewritten"}, headers=other_auth_headers
+    )
+    assert response.status_code == 404
+    response = await client.request(
+        "DELETE",
+        "/api/v1/tasks/bulk",
+        json={"ids": [task_id]},
+        headers=other_auth_headers,
+    )
+    assert response.json()["results"] == [{"id": task_id, "status": 404, "task": None}]
+    response = await client.delete(f"/api/v1/tasks/{task_id}", headers=other_auth_headers)
+    assert response.status_code == 404
+
+    response = await client.get(f"/api/v1/tasks/groups/{group_id}", headers=auth_headers)
+    assert [t["title"] for t in response.json()["items"]] == ["Mine"]
+
+
+async def test_members_cannot_manage_membership(
+    client: AsyncClient, other_auth_headers, group_id, test_user
+):
+    response = await client.delete(
+        f"/api/v1/groups/{group_id}/members/{test_user.id}", headers=other_auth_headers
+    )
+    assert response.status_code == 403
+
+
+async def test_last_owner_cannot_leave(
+    client: AsyncClient, auth_headers, group_id, test_user
+):
+    response = await client.delete(
+        f"/api/v1/groups/{group_id}/members/{test_user.id}", headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+async def test_group_list_pages_with_cursor(
+    client: AsyncClient, auth_headers, group_id, test_user, db: AsyncSession
+):
+    await db.execute(
+        insert(Task),
+        [{"title": f"T{i}", "owner_id": test_user.id, "group_id": group_id} for i in range(5)],
+    )
+    await db.commit()
+
+    titles, cursor = [], None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        response = await client.get(
+            f"/api/v1/tasks/groups/{group_id}", params=params, headers=auth_headers
+        )
+        titles += [t["title"] for t in response.json()["items"]]
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert titles == [f"T{i}" for i in range(5)]
+
+
+async def test_group_list_queries_use_indexes(db: AsyncSession, group_id, test_user):
+    dialect = db.get_bind().dialect
+    for query in (
+        build_group_list_query(group_id, 0, 20),
+        build_group_list_query(group_id, 0, 20, member_id=test_user.id),
+    ):
+        compiled = query.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        result = await db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+        plan = " ".join(row[-1] for row in result.all())
+        assert "ix_tasks_group_id_id" in plan
+        assert "SCAN tasks" not in plan
@@ -0,0 +1,111 @@
+import json
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import importer
+from app.archive import archive_completed_tasks
+from app.importer import (
+    import_tasks,
+    import_users,
+    read_records,
+    synthetic_tasks,
+    synthetic_users,
+)
+from app.models.task import Task
+from app.models.user import User
+from app.security import verify_password
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_import_from_files(db: AsyncSession, tmp_path):
+    users_file = tmp_path / "users.ndjson"
+    users_file.write_text(
+        "\n".join(
+            json.dumps({"email": f"u{i}@example.com", "password": "secret123"}) for i in range(3)
+        )
+    )
+    tasks_file = tmp_path / "tasks.csv"
+    tasks_file.write_text(
+        "owner_email,title,description,completed\n"
+        "u0@example.com,First,,false\n"
+        "u0@example.com,Second,details,true\n"
+        "u2@example.com,Third,,0\n"
+    )
+
+    stats = await import_users(db, read_records(users_file), batch_size=2, hash_workers=1)
+    assert stats.rows == 3
+    stats = await import_tasks(db, read_records(tasks_file), batch_size=2)
+    assert stats.rows == 3
+
+    users = (await db.execute(select(User).order_by(User.id))).scalars().all()
+    assert [u.email for u in users] == ["u0@example.com", "u1@example.com", "u2@example.com"]
+    assert users[0].hashed_password == users[1].hashed_password
+    assert verify_password("secret123", users[0].hashed_password)
+
+    await db.refresh(users[0])
+    assert (users[0].task_count, users[0].completed_count) == (2, 1)
+    task = (await db.execute(select(Task).where(Task.title == "Second"))).scalar_one()
+    assert task.description == "details"
+    assert task.completed is True
+    assert task.version == 1
+
+
+async def test_import_synthetic(db: AsyncSession):
+    await import_users(db, synthetic_users(2, "password123"), hash_workers=1)
+    await import_tasks(db, synthetic_tasks(2, 10), batch_size=7)
+
+    total = await db.scalar(select(func.count()).select_from(Task))
+    assert total == 20
+    counts = (await db.execute(select(User.task_count, User.completed_count))).all()
+    assert counts == [(10, 4), (10, 4)]
+
+
+async def test_import_skips_unknown_owners(db: AsyncSession):
+    await import_users(db, synthetic_users(1, "password123"), hash_workers=1)
+    records = [
+        {"owner_email": "user0@example.com", "title": "Kept"},
+        {"owner_email": "nobody@example.com", "title": "Orphan"},
+        {"owner_id": "999", "title": "Dangling"},
+        {"owner_email": "user0@example.com", "title": "Also kept"},
+    ]
+
+    stats = await import_tasks(db, records, batch_size=2)
+
+    assert (stats.rows, stats.skipped) == (2, 2)
+    titles = (await db.scalars(select(Task.title).order_by(Task.id))).all()
+    assert titles == ["Kept", "Also kept"]
+    assert await db.scalar(select(User.task_count)) == 2
+
+
+async def test_password_hashes_survive_memo_eviction(db: AsyncSession, monkeypatch):
+    monkeypatch.setattr(importer, "HASH_MEMO_SIZE", 2)
+    records = [{"email": f"u{i}@example.com", "password": f"pw{i % 3}"} for i in range(6)]
+
+    stats = await import_users(db, records, batch_size=4, hash_workers=1)
+
+    assert stats.rows == 6
+    hashes = (await db.scalars(select(User.hashed_password).order_by(User.id))).all()
+    assert verify_password("pw2", hashes[5])
+
+
+async def test_imported_tasks_are_stamped_updated_at(db: AsyncSession, monkeypatch):
+    copied = []
+    copy_rows = importer._copy_rows
+
+    async def record_copy(session, table, columns, rows):
+        copied.extend(dict(zip(columns, row)) for row in rows)
+        await copy_rows(session, table, columns, rows)
+
+    # On Postgres the rows go through COPY, which applies no Python defaults,
+    # so the stamp has to be in the copied rows themselves.
+    monkeypatch.setattr(importer, "_copy_rows", record_copy)
+    await import_users(db, synthetic_users(1, "password123"), hash_workers=1)
+    copied.clear()
+    await import_tasks(db, synthetic_tasks(1, 3))
+
+    assert all(row["updated_at"] is not None for row in copied)
+    assert await archive_completed_tasks(db, timedelta(days=30)) == 0
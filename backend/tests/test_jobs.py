@@ -0,0 +1,166 @@
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.jobs import JobWorker, enqueue, job_handler
+from app.models.job import Job
+from app.models.task import Task
+from app.timeutils import utcnow
+from tests.conftest import async_session
+
+pytestmark = pytest.mark.asyncio
+
+attempts: list[int] = []
+
+
+@job_handler("test_flaky")
+async def _flaky(db: AsyncSession, payload: dict) -> dict:
+    attempts.append(1)
+    if len(attempts) < payload["fail_times"] + 1:
+        raise RuntimeError("boom")
+    return {"ok": True}
+
+
+@job_handler("test_writes_then_fails")
+async def _writes_then_fails(db: AsyncSession, payload: dict) -> dict:
+    await db.execute(update(Task).values(title="never committed"))
+    raise RuntimeError("boom")
+
+
+async def _make_due(db: AsyncSession, job_id: int) -> None:
+    await db.execute(
+        update(Job).where(Job.id == job_id).values(run_at=utcnow() - timedelta(seconds=1))
+    )
+    await db.commit()
+
+
+async def test_delete_completed_runs_as_job(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    db: AsyncSession,
+):
+    db.add_all(
+        [
+            Task(title="Done 1", completed=True, owner_id=test_user.id),
+            Task(title="Done 2", completed=True, owner_id=test_user.id),
+            Task(title="Open", owner_id=test_user.id),
+        ]
+    )
+    await db.commit()
+
+    response = await client.delete("/api/v1/tasks/completed", headers=auth_headers)
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["location"] == f"/api/v1/jobs/{job_id}"
+    assert response.json()["status"] == "queued"
+
+    worker = JobWorker(async_session, concurrency=1, poll_interval=0)
+    assert await worker.run_once()
+    assert not await worker.run_once()
+
+    response = await client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers)
+    data = response.json()
+    assert data["status"] == "succeeded"
+    assert data["result"] == {"deleted": 2}
+
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 1, "completed": 0}
+
+
+async def test_job_retries_then_fails(db: AsyncSession):
+    attempts.clear()
+    job = await enqueue(db, "test_flaky", {"fail_times": 5})
+    worker = JobWorker(async_session, concurrency=1, poll_interval=0)
+
+    assert await worker.run_once()
+    await db.refresh(job)
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert not await worker.run_once()  # backing off
+
+    for expected_attempts in (2, 3):
+        await _make_due(db, job.id)
+        assert await worker.run_once()
+        await db.refresh(job)
+        assert job.attempts == expected_attempts
+
+    assert job.status == "failed"
+    assert "boom" in job.error
+
+
+async def test_job_retry_succeeds(db: AsyncSession):
+    attempts.clear()
+    job = await enqueue(db, "test_flaky", {"fail_times": 1})
+    worker = JobWorker(async_session, concurrency=1, poll_interval=0)
+
+    await worker.run_once()
+    await _make_due(db, job.id)
+    await worker.run_once()
+
+    await db.refresh(job)
+    assert job.status == "succeeded"
+    assert job.result == {"ok": True}
+
+
+async def test_get_job_other_user(client: AsyncClient, other_user, auth_headers, db):
+    job = await enqueue(db, "test_flaky", {"fail_times": 0}, owner_id=other_user.id)
+    response = await client.get(f"/api/v1/jobs/{job.id}", headers=auth_headers)
+    assert response.status_code == 404
+
+
+async def test_failed_job_with_pending_writes_is_retried(test_user, db: AsyncSession):
+    db.add(Task(title="Kept", owner_id=test_user.id))
+    job = await enqueue(db, "test_writes_then_fails", {})
+    worker = JobWorker(async_session, concurrency=1, poll_interval=0)
+
+    assert await worker.run_once()
+
+    await db.refresh(job)
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert "boom" in job.error
+    assert await db.scalar(select(Task.title)) == "Kept"
+
+
+async def test_stale_running_jobs_are_reclaimed(db: AsyncSession):
+    attempts.clear()
+    stale = utcnow() - timedelta(hours=1)
+    job = await enqueue(db, "test_flaky", {"fail_times": 0})
+    spent = await enqueue(db, "test_flaky", {"fail_times": 0})
+    await db.execute(
+        update(Job).where(Job.id == job.id).values(status="running", attempts=1, updated_at=stale)
+    )
+    await db.execute(
+        update(Job)
+        .where(Job.id == spent.id)
+        .values(status="running", attempts=3, updated_at=stale)
+    )
+    await db.commit()
+
+    worker = JobWorker(async_session, concurrency=1, poll_interval=0)
+    assert await worker.run_once()
+
+    await db.refresh(job)
+    await db.refresh(spent)
+    assert (job.status, job.attempts) == ("succeeded", 2)
+    assert spent.status == "failed"
+    assert spent.error == "Worker lease expired"
+
+
+async def test_pending_jobs_are_deduped_across_sessions(db: AsyncSession):
+    async with async_session() as first, async_session() as second:
+        job = await enqueue(first, "test_flaky", {"fail_times": 0}, dedupe_key="once")
+        again = await enqueue(second, "test_flaky", {"fail_times": 0}, dedupe_key="once")
+    assert again.id == job.id
+    assert await db.scalar(select(func.count()).select_from(Job)) == 1
+
+    worker = JobWorker(async_session, concurrency=1, poll_interval=0)
+    assert await worker.run_once()
+
+    after = await enqueue(db, "test_flaky", {"fail_times": 0}, dedupe_key="once")
+    assert after.id != job.id
+    assert after.status == "queued"
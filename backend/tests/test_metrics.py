@@ -0,0 +1,36 @@
+import pytest
+from httpx import AsyncClient
+
+from app.metrics import Histogram, registry
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_histogram_buckets():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+    assert histogram.cumulative() == [("0.1", 1), ("1.0", 2), ("+Inf", 3)]
+
+
+async def test_server_timing_header(client: AsyncClient, auth_headers):
+    response = await client.get("/api/v1/tasks/", headers=auth_headers)
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert '"3 queries"' in timing  # user lookup, task counter, task page
+    assert "app;dur=" in timing
+
+
+async def test_metrics_endpoint(client: AsyncClient, auth_headers, test_user):
+    registry.clear()
+    await client.get(f"/api/v1/tasks/{test_user.id}", headers=auth_headers)
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/tasks/{task_id}",status="404"} 1' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/tasks/{task_id}"} 1' in body
+    assert 'db_statements_total{method="GET",route="/api/v1/tasks/{task_id}"} 2' in body
+    assert "user_cache_misses_total" in body
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import Base
+from app.migrations import load_migrations, migrate
+
+pytestmark = pytest.mark.asyncio
+
+
+def _schema(sync_conn) -> dict:
+    inspector = inspect(sync_conn)
+    return {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            {index["name"] for index in inspector.get_indexes(table)},
+        )
+        for table in inspector.get_table_names()
+        if table != "schema_migrations" and not table.startswith("tasks_fts")
+    }
+
+
+@pytest.fixture
+async def file_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    yield engine
+    await engine.dispose()
+
+
+async def test_migrations_match_models(tmp_path, file_engine):
+    await migrate(file_engine)
+
+    models_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'models.db'}")
+    async with models_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        expected = await conn.run_sync(_schema)
+    await models_engine.dispose()
+
+    async with file_engine.connect() as conn:
+        assert await conn.run_sync(_schema) == expected
+
+
+async def test_migrations_upgrade_pre_migration_database(file_engine):
+    migrations = load_migrations()
+    await migrate(file_engine, migrations[:1])
+    async with file_engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@b.c', 'x')")
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO tasks (title, completed, owner_id) "
+                "VALUES ('legacy milk', 1, 1), ('legacy eggs', 0, 1)"
+            )
+        )
+
+    applied = await migrate(file_engine, migrations)
+    assert applied == [migration.name for migration in migrations[1:]]
+
+    async with file_engine.connect() as conn:
+        counts = await conn.execute(text("SELECT task_count, completed_count FROM users"))
+        assert counts.one() == (2, 1)
+        seqs = await conn.execute(text("SELECT title, change_seq FROM tasks ORDER BY id"))
+        assert seqs.all() == [("legacy milk", 1), ("legacy eggs", 2)]
+        assert await conn.scalar(text("SELECT change_seq FROM users")) == 2
+        matches = await conn.scalars(
+            text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'milk'")
+        )
+        assert len(matches.all()) == 1
+
+
+async def test_warm_start_is_a_single_query(file_engine):
+    assert await migrate(file_engine)
+
+    statements = []
+    event.listen(
+        file_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    assert await migrate(file_engine) == []
+
+    assert len(statements) == 1
+    assert "schema_migrations" in statements[0]
@@ -0,0 +1,27 @@
+import time
+
+import pytest
+
+from app.ratelimit import InMemoryBackend
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_token_bucket_refills(monkeypatch):
+    backend = InMemoryBackend()
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    assert await backend.acquire("k", capacity=2, refill_per_second=1) == 0
+    assert await backend.acquire("k", capacity=2, refill_per_second=1) == 0
+    assert await backend.acquire("k", capacity=2, refill_per_second=1) == pytest.approx(1)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 1)
+    assert await backend.acquire("k", capacity=2, refill_per_second=1) == 0
+
+
+async def test_backend_is_bounded():
+    backend = InMemoryBackend(maxsize=2)
+    for key in ("a", "b", "c"):
+        await backend.acquire(key, capacity=1, refill_per_second=1)
+    assert list(backend._buckets) == ["b", "c"]
@@ -0,0 +1,64 @@
+import asyncio
+
+import bcrypt
+import jwt
+import pytest
+
+from app.config import settings
+from app.security import (
+    PasswordHasher,
+    PasswordHasherBusy,
+    create_access_token,
+    decode_token,
+    hash_password,
+    needs_rehash,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_password_hasher_round_trip():
+    hasher = PasswordHasher(max_workers=1, queue_limit=4)
+    hashed = await hasher.hash("password123")
+    assert await hasher.verify("password123", hashed)
+    assert not await hasher.verify("wrong", hashed)
+    hasher.shutdown()
+
+
+async def test_password_hasher_queue_full():
+    hasher = PasswordHasher(max_workers=1, queue_limit=1)
+    first = asyncio.create_task(hasher.hash("password123"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("password123")
+
+    await first
+    hasher.shutdown()
+
+
+async def test_needs_rehash(monkeypatch):
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    assert not needs_rehash(hash_password("password123"))
+
+    stale = bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=5)).decode()
+    assert needs_rehash(stale)
+    assert needs_rehash("not-a-bcrypt-hash")
+
+
+async def test_decode_token_uses_cache(monkeypatch):
+    token = create_access_token(1)
+    payload = decode_token(token)
+    assert payload["sub"] == "1"
+    assert payload["jti"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("token verified twice")
+
+    monkeypatch.setattr(jwt, "decode", fail)
+    assert decode_token(token) == payload
+
+
+async def test_decode_token_rejects_tampered():
+    token = create_access_token(1)
+    assert decode_token(token[:-2] + "xx") is None
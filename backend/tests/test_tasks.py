@@ -1,9 +1,19 @@
+import csv
+import io
+import json
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import text, update
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.task import Task
+from app.config import settings
+from app.counters import repair_task_counters
+from app.models.task import SEARCH_DOCUMENT, Task
 from app.models.user import User
+from app.routers.tasks import build_list_query
+from app.search import build_search_query
 
 pytestmark = pytest.mark.asyncio
 
@@ -218,3 +228,548 @@ async def test_delete_task_other_user(
 
     response = await client.delete(f"/api/v1/tasks/{task.id}", headers=auth_headers)
     assert response.status_code == 404
+
+
+async def test_list_tasks_cursor_pagination(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    db: AsyncSession,
+):
+    for i in range(5):
+        db.add(Task(title=f"Task {i}", owner_id=test_user.id))
+    await db.commit()
+
+    response = await client.get("/api/v1/tasks/?limit=2", headers=auth_headers)
+    data = response.json()
+    assert [t["title"] for t in data["items"]] == ["Task 0", "Task 1"]
+    assert data["total"] == 5
+    cursor = data["next_cursor"]
+
+    seen = [t["title"] for t in data["items"]]
+    while cursor:
+        response = await client.get(
+            f"/api/v1/tasks/?limit=2&cursor={cursor}", headers=auth_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        seen.extend(t["title"] for t in data["items"])
+        cursor = data["next_cursor"]
+
+    assert seen == [f"Task {i}" for i in range(5)]
+
+
+async def test_list_tasks_cursor_include_total(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    db: AsyncSession,
+):
+    for i in range(3):
+        db.add(Task(title=f"Task {i}", owner_id=test_user.id))
+    await db.commit()
+
+    first = await client.get("/api/v1/tasks/?limit=1", headers=auth_headers)
+    cursor = first.json()["next_cursor"]
+
+    response = await client.get(
+        f"/api/v1/tasks/?limit=1&cursor={cursor}&include_total=true",
+        headers=auth_headers,
+    )
+    data = response.json()
+    assert data["total"] == 3
+    assert data["items"][0]["title"] == "Task 1"
+
+
+async def test_list_tasks_invalid_cursor(client: AsyncClient, auth_headers):
+    response = await client.get("/api/v1/tasks/?cursor=not-a-cursor", headers=auth_headers)
+    assert response.status_code == 400
+
+
+async def test_list_tasks_cursor_other_user(
+    client: AsyncClient,
+    other_auth_headers,
+    auth_headers,
+    test_user,
+    db: AsyncSession,
+):
+    for i in range(2):
+        db.add(Task(title=f"Task {i}", owner_id=test_user.id))
+    await db.commit()
+
+    first = await client.get("/api/v1/tasks/?limit=1", headers=auth_headers)
+    cursor = first.json()["next_cursor"]
+
+    response = await client.get(f"/api/v1/tasks/?cursor={cursor}", headers=other_auth_headers)
+    assert response.status_code == 400
+
+
+async def test_bulk_create_tasks(client: AsyncClient, auth_headers, test_user):
+    response = await client.post(
+        "/api/v1/tasks/bulk",
+        headers=auth_headers,
+        json={"items": [{"title": "A"}, {"title": "B", "description": "second"}]},
+    )
+    assert response.status_code == 201
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == [201, 201]
+    assert [r["task"]["title"] for r in results] == ["A", "B"]
+    assert all(r["task"]["owner_id"] == test_user.id for r in results)
+
+    response = await client.get("/api/v1/tasks/", headers=auth_headers)
+    assert response.json()["total"] == 2
+
+
+async def test_bulk_create_tasks_too_many(client: AsyncClient, auth_headers):
+    response = await client.post(
+        "/api/v1/tasks/bulk",
+        headers=auth_headers,
+        json={"items": [{"title": "x"}] * (settings.bulk_max_items + 1)},
+    )
+    assert response.status_code == 422
+
+
+async def test_bulk_update_tasks(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    other_user,
+    db: AsyncSession,
+):
+    mine = [
+        Task(title="Mine 1", owner_id=test_user.id),
+        Task(title="Mine 2", owner_id=test_user.id),
+    ]
+    theirs = Task(title="Theirs", owner_id=other_user.id)
+    db.add_all([*mine, theirs])
+    await db.commit()
+
+    response = await client.patch(
+        "/api/v1/tasks/bulk",
+        headers=auth_headers,
+        json={
+            "items": [
+                {"id": mine[0].id, "completed": True},
+                {"id": mine[1].id, "title": "Renamed"},
+                {"id": theirs.id, "title": "Hacked"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == [200, 200, 404]
+    assert results[0]["task"]["completed"] is True
+    assert results[0]["task"]["title"] == "Mine 1"
+    assert results[1]["task"]["title"] == "Renamed"
+    assert results[2]["task"] is None
+
+    await db.refresh(theirs)
+    assert theirs.title == "Theirs"
+
+
+async def test_bulk_delete_tasks(
+    client: AsyncClient,
+    auth_headers,
+    other_auth_headers,
+    test_user,
+    other_user,
+    db: AsyncSession,
+):
+    mine = Task(title="Mine", owner_id=test_user.id)
+    theirs = Task(title="Theirs", owner_id=other_user.id)
+    db.add_all([mine, theirs])
+    await db.commit()
+
+    response = await client.request(
+        "DELETE",
+        "/api/v1/tasks/bulk",
+        headers=auth_headers,
+        json={"ids": [mine.id, theirs.id, 9999]},
+    )
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == [204, 404, 404]
+
+    response = await client.get(f"/api/v1/tasks/{mine.id}", headers=auth_headers)
+    assert response.status_code == 404
+    response = await client.get(f"/api/v1/tasks/{theirs.id}", headers=other_auth_headers)
+    assert response.status_code == 200
+
+
+async def test_export_tasks_ndjson(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    other_user,
+    db: AsyncSession,
+    monkeypatch,
+):
+    monkeypatch.setattr(settings, "export_chunk_size", 2)
+    for i in range(5):
+        db.add(Task(title=f"Task {i}", owner_id=test_user.id))
+    db.add(Task(title="Other's task", owner_id=other_user.id))
+    await db.commit()
+
+    response = await client.get("/api/v1/tasks/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == [f"Task {i}" for i in range(5)]
+    assert rows[0] == {
+        "id": rows[0]["id"],
+        "title": "Task 0",
+        "description": None,
+        "completed": False,
+        "owner_id": test_user.id,
+        "group_id": None,
+    }
+
+
+async def test_export_tasks_csv(client: AsyncClient, auth_headers, test_user, db: AsyncSession):
+    db.add(Task(title="Comma, task", description="line", owner_id=test_user.id))
+    await db.commit()
+
+    response = await client.get("/api/v1/tasks/export?format=csv", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "title", "description", "completed", "owner_id", "group_id"]
+    assert rows[1][1:] == ["Comma, task", "line", "False", str(test_user.id), ""]
+
+
+async def test_export_tasks_invalid_format(client: AsyncClient, auth_headers):
+    response = await client.get("/api/v1/tasks/export?format=xml", headers=auth_headers)
+    assert response.status_code == 422
+
+
+async def test_search_tasks(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    other_user,
+    db: AsyncSession,
+):
+    db.add_all(
+        [
+            Task(title="Buy milk", description="and eggs", owner_id=test_user.id),
+            Task(title="Milk the cows", description="milk milk", owner_id=test_user.id),
+            Task(title="Walk the dog", owner_id=test_user.id),
+            Task(title="Their milk", owner_id=other_user.id),
+        ]
+    )
+    await db.commit()
+
+    response = await client.get("/api/v1/tasks/search?q=milk", headers=auth_headers)
+    assert response.status_code == 200
+    titles = [t["title"] for t in response.json()["items"]]
+    assert titles == ["Milk the cows", "Buy milk"]
+
+    response = await client.get("/api/v1/tasks/search?q=eggs%20milk", headers=auth_headers)
+    assert [t["title"] for t in response.json()["items"]] == ["Buy milk"]
+
+
+async def test_search_tasks_tracks_updates_and_deletes(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    db: AsyncSession,
+):
+    task = Task(title="Old title", owner_id=test_user.id)
+    db.add(task)
+    await db.commit()
+
+    await client.patch(f"/api/v1/tasks/{task.id}", headers=auth_headers, json={"title": "New"})
+    response = await client.get("/api/v1/tasks/search?q=old", headers=auth_headers)
+    assert response.json()["items"] == []
+    response = await client.get("/api/v1/tasks/search?q=new", headers=auth_headers)
+    assert len(response.json()["items"]) == 1
+
+    await client.delete(f"/api/v1/tasks/{task.id}", headers=auth_headers)
+    response = await client.get("/api/v1/tasks/search?q=new", headers=auth_headers)
+    assert response.json()["items"] == []
+
+
+async def test_search_tasks_ignores_query_syntax(client: AsyncClient, auth_headers):
+    response = await client.get('/api/v1/tasks/search?q="OR*(-', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+
+async def test_task_stats(client: AsyncClient, auth_headers, test_user, db: AsyncSession):
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 0, "completed": 0}
+
+    created = await client.post("/api/v1/tasks/", headers=auth_headers, json={"title": "One"})
+    task_id = created.json()["id"]
+    await client.post(
+        "/api/v1/tasks/bulk",
+        headers=auth_headers,
+        json={"items": [{"title": "Two"}, {"title": "Three"}]},
+    )
+    await client.patch(f"/api/v1/tasks/{task_id}", headers=auth_headers, json={"completed": True})
+
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 3, "completed": 1}
+
+    listed = await client.get("/api/v1/tasks/", headers=auth_headers)
+    ids = [t["id"] for t in listed.json()["items"]]
+    await client.patch(
+        "/api/v1/tasks/bulk",
+        headers=auth_headers,
+        json={"items": [{"id": ids[1], "completed": True}, {"id": ids[2], "completed": True}]},
+    )
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 3, "completed": 3}
+
+    await client.delete(f"/api/v1/tasks/{task_id}", headers=auth_headers)
+    await client.request(
+        "DELETE", "/api/v1/tasks/bulk", headers=auth_headers, json={"ids": [ids[1]]}
+    )
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 1, "completed": 1}
+
+
+async def test_repair_task_counters(client: AsyncClient, auth_headers, test_user, db: AsyncSession):
+    db.add_all([Task(title="A", owner_id=test_user.id), Task(title="B", owner_id=test_user.id)])
+    await db.commit()
+    await db.execute(
+        update(User).where(User.id == test_user.id).values(task_count=99, completed_count=7)
+    )
+    await db.commit()
+
+    assert await repair_task_counters(db) == 1
+
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 2, "completed": 0}
+
+
+async def test_update_task_completed_unchanged(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    db: AsyncSession,
+):
+    task = Task(title="Done", completed=True, owner_id=test_user.id)
+    db.add(task)
+    await db.commit()
+
+    response = await client.patch(
+        f"/api/v1/tasks/{task.id}",
+        headers=auth_headers,
+        json={"title": "Still done", "completed": True},
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Still done"
+
+    response = await client.get("/api/v1/tasks/stats", headers=auth_headers)
+    assert response.json() == {"total": 1, "completed": 1}
+
+
+async def test_update_task_empty_body(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    db: AsyncSession,
+):
+    task = Task(title="Unchanged", owner_id=test_user.id)
+    db.add(task)
+    await db.commit()
+
+    response = await client.patch(f"/api/v1/tasks/{task.id}", headers=auth_headers, json={})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Unchanged"
+
+
+async def test_get_task_etag(client: AsyncClient, auth_headers, test_user, db: AsyncSession):
+    task = Task(title="Cached", owner_id=test_user.id)
+    db.add(task)
+    await db.commit()
+
+    response = await client.get(f"/api/v1/tasks/{task.id}", headers=auth_headers)
+    etag = response.headers["etag"]
+
+    response = await client.get(
+        f"/api/v1/tasks/{task.id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    await client.patch(f"/api/v1/tasks/{task.id}", headers=auth_headers, json={"title": "New"})
+    response = await client.get(
+        f"/api/v1/tasks/{task.id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+async def test_list_tasks_etag(client: AsyncClient, auth_headers, test_user, db: AsyncSession):
+    task = Task(title="Listed", owner_id=test_user.id)
+    db.add(task)
+    await db.commit()
+
+    response = await client.get("/api/v1/tasks/", headers=auth_headers)
+    etag = response.headers["etag"]
+
+    response = await client.get("/api/v1/tasks/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.patch(
+        "/api/v1/tasks/bulk",
+        headers=auth_headers,
+        json={"items": [{"id": task.id, "completed": True}]},
+    )
+    response = await client.get("/api/v1/tasks/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+
+
+async def test_update_task_if_match(client: AsyncClient, auth_headers, test_user, db: AsyncSession):
+    task = Task(title="Original", owner_id=test_user.id)
+    db.add(task)
+    await db.commit()
+
+    response = await client.get(f"/api/v1/tasks/{task.id}", headers=auth_headers)
+    etag = response.headers["etag"]
+
+    response = await client.patch(
+        f"/api/v1/tasks/{task.id}",
+        headers={**auth_headers, "If-Match": etag},
+        json={"title": "First"},
+    )
+    assert response.status_code == 200
+
+    response = await client.patch(
+        f"/api/v1/tasks/{task.id}",
+        headers={**auth_headers, "If-Match": etag},
+        json={"title": "Second"},
+    )
+    assert response.status_code == 412
+
+    response = await client.get(f"/api/v1/tasks/{task.id}", headers=auth_headers)
+    assert response.json()["title"] == "First"
+
+    response = await client.patch(
+        "/api/v1/tasks/9999",
+        headers={**auth_headers, "If-Match": etag},
+        json={"title": "Missing"},
+    )
+    assert response.status_code == 404
+
+
+async def _seed_filter_tasks(db: AsyncSession, owner_id: int) -> None:
+    db.add_all(
+        [
+            Task(title="banana", owner_id=owner_id),
+            Task(title="apple", completed=True, owner_id=owner_id),
+            Task(title="apricot", owner_id=owner_id),
+            Task(title="cherry", completed=True, owner_id=owner_id),
+            Task(title="a%b", owner_id=owner_id),
+        ]
+    )
+    await db.commit()
+
+
+async def test_list_tasks_filter_completed(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    db: AsyncSession,
+):
+    await _seed_filter_tasks(db, test_user.id)
+
+    response = await client.get("/api/v1/tasks/?completed=false", headers=auth_headers)
+    data = response.json()
+    assert [t["title"] for t in data["items"]] == ["banana", "apricot", "a%b"]
+    assert data["total"] == 3
+
+    response = await client.get("/api/v1/tasks/?completed=true", headers=auth_headers)
+    data = response.json()
+    assert [t["title"] for t in data["items"]] == ["apple", "cherry"]
+    assert data["total"] == 2
+
+
+async def test_list_tasks_sort(client: AsyncClient, auth_headers, test_user, db: AsyncSession):
+    await _seed_filter_tasks(db, test_user.id)
+
+    response = await client.get("/api/v1/tasks/?sort=title", headers=auth_headers)
+    titles = [t["title"] for t in response.json()["items"]]
+    assert titles == ["a%b", "apple", "apricot", "banana", "cherry"]
+
+    response = await client.get("/api/v1/tasks/?sort=-title", headers=auth_headers)
+    assert [t["title"] for t in response.json()["items"]] == titles[::-1]
+
+    response = await client.get("/api/v1/tasks/?sort=-id&limit=2", headers=auth_headers)
+    data = response.json()
+    assert [t["title"] for t in data["items"]] == ["a%b", "cherry"]
+    response = await client.get(
+        f"/api/v1/tasks/?sort=-id&limit=2&cursor={data['next_cursor']}", headers=auth_headers
+    )
+    assert [t["title"] for t in response.json()["items"]] == ["apricot", "apple"]
+
+
+async def test_list_tasks_cursor_requires_id_sort(client: AsyncClient, auth_headers):
+    response = await client.get("/api/v1/tasks/?sort=title&cursor=abc", headers=auth_headers)
+    assert response.status_code == 400
+
+
+async def test_list_tasks_title_prefix(
+    client: AsyncClient,
+    auth_headers,
+    test_user,
+    db: AsyncSession,
+):
+    await _seed_filter_tasks(db, test_user.id)
+
+    response = await client.get("/api/v1/tasks/?title_prefix=ap&sort=title", headers=auth_headers)
+    data = response.json()
+    assert [t["title"] for t in data["items"]] == ["apple", "apricot"]
+    assert data["total"] == 2
+
+    response = await client.get(
+        "/api/v1/tasks/?title_prefix=ap&completed=false", headers=auth_headers
+    )
+    assert [t["title"] for t in response.json()["items"]] == ["apricot"]
+
+    response = await client.get("/api/v1/tasks/?title_prefix=a%25", headers=auth_headers)
+    assert [t["title"] for t in response.json()["items"]] == ["a%b"]
+
+
+async def test_title_prefix_on_postgres_is_a_plain_like():
+    query = build_list_query(1, title_prefix="az", dialect_name="postgresql")
+    where = str(query.whereclause.compile(dialect=postgresql.dialect()))
+
+    assert "tasks.title LIKE" in where
+    assert "tasks.title >=" not in where
+    assert "tasks.title <" not in where
+
+
+async def test_postgres_search_matches_the_index_expression():
+    query = build_search_query("postgresql", 1, ["milk"])
+    where = str(query.whereclause.compile(dialect=postgresql.dialect()))
+
+    assert f"{SEARCH_DOCUMENT} @@ plainto_tsquery" in where
+
+
+async def _query_plan(db: AsyncSession, query) -> str:
+    compiled = query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    result = await db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    return " ".join(row[-1] for row in result.all())
+
+
+@pytest.mark.parametrize(
+    ("filters", "index"),
+    [
+        ({}, "ix_tasks_owner_id_id"),
+        ({"completed": False}, "ix_tasks_owner_id_completed_id"),
+        ({"completed": True}, "ix_tasks_owner_id_completed_id"),
+        ({"sort": "title"}, "ix_tasks_owner_id_title_id"),
+        ({"title_prefix": "ap", "sort": "title"}, "ix_tasks_owner_id_title_id"),
+        ({"completed": False, "sort": "title"}, "ix_tasks_open_owner_id_title_id"),
+    ],
+)
+async def test_list_query_plans(db: AsyncSession, test_user, filters, index):
+    plan = await _query_plan(db, build_list_query(test_user.id, **filters).limit(20))
+    assert index in plan
+    assert "USE TEMP B-TREE" not in plan